@@ -0,0 +1,8 @@
+from src import create_async_app
+import os
+
+app = create_async_app()
+
+
+if __name__ == "__main__":
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
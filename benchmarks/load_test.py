@@ -0,0 +1,346 @@
+"""
+Load test of the start_chat -> continue_chat -> chat_history flow.
+
+    python -m benchmarks.load_test [--users 60] [--concurrency 8] [--turns 3]
+        [--llm-latency-ms 50] [--baseline benchmarks/baseline.local.json]
+
+Gemini is replaced by a fake model with configurable latency and Redis by
+fakeredis, so the run needs neither network access nor credentials. Every
+other layer (prompt building, schedule search, context windowing, session
+storage, response cache) is the real code. Per-stage times come from the
+Server-Timing header each response carries.
+
+With --baseline the run exits with status 1 when p95 latency of any
+endpoint or overall throughput regresses past --tolerance; --save-baseline
+writes the current numbers as the new baseline. The baseline holds
+absolute latencies and requests per second, so it has to be recorded on
+the machine that runs the check with the same options; a baseline saved
+with a different config is refused with status 2 before anything runs.
+benchmarks/baseline.example.json only shows the format.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import fakeredis
+
+from src import create_app
+from src.external.gemini_client import chat_cache
+from src.external.prompt_generator import PROGRAM_BASE_CREDITS
+from src.services.catalog_store import catalog_store
+from src.services.response_cache import LocalCacheBackend, ResponseCache
+from src.services.session_store import RedisSessionStore
+
+ENDPOINTS = ("start_chat", "continue_chat", "chat_history")
+STAGES = ("prompt", "llm", "session")
+FOLLOW_UPS = (
+    "Which of these fits a part-time job in the afternoons?",
+    "Can you swap one course for something more hands-on?",
+    "What should I take next semester after this plan?",
+    "Is the workload realistic with these credits?",
+)
+WORKLOADS = ("", " I prefer a light workload.", " I want a heavy workload.")
+
+
+def _content(message: dict):
+    return SimpleNamespace(
+        role=message["role"],
+        parts=[SimpleNamespace(text=text) for text in message["parts"]],
+    )
+
+
+class FakeChat:
+    def __init__(self, model, history):
+        self.model = model
+        self.history = [_content(m) for m in history]
+
+    def send_message(self, message):
+        self.model.wait()
+        reply = f"Plan for: {message[:60]}"
+        self.history.append(_content({"role": "user", "parts": [message]}))
+        self.history.append(_content({"role": "model", "parts": [reply]}))
+        return SimpleNamespace(text=reply, usage_metadata=None)
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel; every call sleeps like a network round trip."""
+
+    def __init__(self, latency: float, jitter: float, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(delay, 0))
+
+    def start_chat(self, history=None):
+        return FakeChat(self, history or [])
+
+    def generate_content(self, prompt):
+        self.wait()
+        return SimpleNamespace(text="Earlier the student discussed course choices.")
+
+
+def synthetic_inputs(count: int, seed: int = 0) -> list:
+    """Student openers cycling through every program phrase PromptGenerator knows."""
+    rng = random.Random(seed)
+    index = catalog_store.get().index
+    phrases = list(PROGRAM_BASE_CREDITS)
+    inputs = []
+    for i in range(count):
+        phrase = phrases[i % len(phrases)]
+        text = f"Hi, I'm a student in {phrase}."
+        required = sorted(index.required_codes(phrase.replace(" ", "_")))
+        if required:
+            done = rng.sample(required, k=rng.randint(0, min(4, len(required))))
+            text += f" My completed courses are {', '.join(done)}."
+        text += rng.choice(WORKLOADS)
+        if rng.random() < 0.3:
+            text += " No classes on friday."
+        inputs.append(text)
+    return inputs
+
+
+@contextmanager
+def fake_backends(llm_latency: float, llm_jitter: float):
+    store = RedisSessionStore()
+    store.client = fakeredis.FakeRedis(decode_responses=True)
+    cache = ResponseCache(LocalCacheBackend(max_entries=1024, ttl=3600))
+    model = FakeModel(llm_latency, llm_jitter)
+    chat_cache.clear()
+    with patch("src.external.gemini_client.get_model", return_value=model), patch(
+        "src.controllers.planner.session_store", store
+    ), patch("src.controllers.planner.response_cache", cache):
+        yield
+    chat_cache.clear()
+
+
+def parse_server_timing(header: str) -> dict:
+    stages = {}
+    for entry in (header or "").split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        if duration:
+            stages[name] = float(duration) / 1000
+    return stages
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)) - 1, 0)]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.stages = defaultdict(lambda: defaultdict(float))
+        self.errors = defaultdict(int)
+
+    def call(self, endpoint: str, send):
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies[endpoint].append(elapsed)
+            if response.status_code != 200:
+                self.errors[endpoint] += 1
+            for name, seconds in parse_server_timing(
+                response.headers.get("Server-Timing")
+            ).items():
+                self.stages[endpoint][name] += seconds
+        return response
+
+
+def _user_flow(app, recorder: Recorder, user_id: str, opener: str, turns: int):
+    client = app.test_client()
+    recorder.call(
+        "start_chat",
+        lambda: client.post(
+            "/api/start_chat", json={"user_id": user_id, "user_input": opener}
+        ),
+    )
+    for turn in range(turns):
+        message = FOLLOW_UPS[turn % len(FOLLOW_UPS)]
+        recorder.call(
+            "continue_chat",
+            lambda: client.post(
+                "/api/continue_chat", json={"user_id": user_id, "message": message}
+            ),
+        )
+    recorder.call(
+        "chat_history", lambda: client.get(f"/api/chat_history?user_id={user_id}")
+    )
+
+
+def run_config(
+    users: int, concurrency: int, turns: int, llm_latency: float, llm_jitter: float
+) -> dict:
+    """The options a report was produced with; baselines only compare on equal ones."""
+    return {
+        "users": users,
+        "concurrency": concurrency,
+        "turns": turns,
+        "llm_latency_ms": llm_latency * 1000,
+        "llm_jitter_ms": llm_jitter * 1000,
+    }
+
+
+def run(
+    users: int = 60,
+    concurrency: int = 8,
+    turns: int = 3,
+    llm_latency: float = 0.05,
+    llm_jitter: float = 0.01,
+    seed: int = 0,
+) -> dict:
+    app = create_app()
+    recorder = Recorder()
+    openers = synthetic_inputs(users, seed)
+
+    with fake_backends(llm_latency, llm_jitter):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(_user_flow, app, recorder, f"bench-{i}", opener, turns)
+                for i, opener in enumerate(openers)
+            ]
+            for future in futures:
+                future.result()
+        wall = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        latencies = recorder.latencies[endpoint]
+        stage_totals = recorder.stages[endpoint]
+        endpoints[endpoint] = {
+            "requests": len(latencies),
+            "errors": recorder.errors[endpoint],
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "stages_ms": {
+                name: stage_totals.get(name, 0.0) / len(latencies) * 1000
+                for name in STAGES
+            },
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "config": run_config(users, concurrency, turns, llm_latency, llm_jitter),
+        "wall_seconds": wall,
+        "requests": total,
+        "rps": total / wall,
+        "endpoints": endpoints,
+    }
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float) -> list:
+    """Returns one message per metric that regressed past `tolerance`."""
+    regressions = []
+    for endpoint, base in baseline["endpoints"].items():
+        current = report["endpoints"].get(endpoint)
+        if current is None:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > limit:
+            regressions.append(
+                f"{endpoint} p95 {current['p95_ms']:.1f}ms > {limit:.1f}ms "
+                f"(baseline {base['p95_ms']:.1f}ms)"
+            )
+    floor = baseline["rps"] * (1 - tolerance)
+    if report["rps"] < floor:
+        regressions.append(
+            f"throughput {report['rps']:.1f} rps < {floor:.1f} rps "
+            f"(baseline {baseline['rps']:.1f} rps)"
+        )
+    return regressions
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['requests']} requests in {report['wall_seconds']:.2f}s "
+        f"({report['rps']:.1f} rps), config {report['config']}",
+        f"{'endpoint':<15}{'p50':>9}{'p95':>9}{'p99':>9}"
+        + "".join(f"{name:>10}" for name in STAGES)
+        + f"{'errors':>8}",
+    ]
+    for endpoint, stats in report["endpoints"].items():
+        lines.append(
+            f"{endpoint:<15}"
+            + "".join(f"{stats[k]:>7.1f}ms" for k in ("p50_ms", "p95_ms", "p99_ms"))
+            + "".join(f"{stats['stages_ms'][name]:>8.1f}ms" for name in STAGES)
+            + f"{stats['errors']:>8}"
+        )
+    lines.append("stage columns are mean time per request")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-jitter-ms", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="fail if slower than this report")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", help="write this run's report here")
+    args = parser.parse_args(argv)
+
+    options = dict(
+        users=args.users,
+        concurrency=args.concurrency,
+        turns=args.turns,
+        llm_latency=args.llm_latency_ms / 1000,
+        llm_jitter=args.llm_jitter_ms / 1000,
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        config = run_config(**options)
+        if baseline["config"] != config:
+            print(
+                f"{args.baseline} was recorded with config {baseline['config']}, "
+                f"this run would use {config}; rerun with the baseline's options "
+                "or record a new baseline with --save-baseline"
+            )
+            return 2
+
+    report = run(seed=args.seed, **options)
+    print(format_report(report))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION: {message}")
+        if regressions:
+            return 1
+        print(f"within {args.tolerance:.0%} of baseline")
+
+    if any(e["errors"] for e in report["endpoints"].values()):
+        print("some requests failed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,27 @@
+from benchmarks import load_test
+
+
+def test_load_test_smoke_run():
+    report = load_test.run(users=4, concurrency=2, turns=2, llm_latency=0, llm_jitter=0)
+
+    assert report["requests"] == 4 * (2 + 2)
+    for endpoint, stats in report["endpoints"].items():
+        assert stats["errors"] == 0, endpoint
+    assert report["endpoints"]["start_chat"]["stages_ms"]["prompt"] > 0
+    assert report["endpoints"]["continue_chat"]["requests"] == 8
+
+
+def test_baseline_comparison_flags_regressions():
+    baseline = {
+        "rps": 100.0,
+        "endpoints": {"start_chat": {"p95_ms": 100.0}, "chat_history": {"p95_ms": 5.0}},
+    }
+    report = {
+        "rps": 90.0,
+        "endpoints": {"start_chat": {"p95_ms": 140.0}, "chat_history": {"p95_ms": 5.5}},
+    }
+
+    regressions = load_test.compare_to_baseline(report, baseline, tolerance=0.25)
+
+    assert len(regressions) == 1 and regressions[0].startswith("start_chat p95")
+    assert load_test.compare_to_baseline(report, baseline, tolerance=0.5) == []
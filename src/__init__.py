@@ -1,14 +1,42 @@
 from flask import Flask
 from flask_cors import CORS
 
+from src.services.timing import add_server_timing, begin_request
+
 
 def create_app():
     app = Flask(__name__)
 
     CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
+    app.before_request(begin_request)
+    app.after_request(add_server_timing)
 
     from src.controllers.planner import planner_bp
 
     app.register_blueprint(planner_bp, url_prefix="/api")
 
     return app
+
+
+def create_async_app():
+    from quart import Quart
+    from quart_cors import cors
+
+    app = Quart(__name__)
+    app = cors(app, allow_origin="http://localhost:3000")
+
+    # Registered as coroutines so they run in the request's own context;
+    # Quart would push plain functions to a worker thread.
+    @app.before_request
+    async def start_timing():
+        begin_request()
+
+    @app.after_request
+    async def report_timing(response):
+        return add_server_timing(response)
+
+    from src.controllers.planner_async import planner_async_bp
+
+    app.register_blueprint(planner_async_bp, url_prefix="/api")
+
+    return app
@@ -1,9 +1,33 @@
+import logging
 import os
 
+from src.services.course_encoder import COURSE_FORMATS
+
+logger = logging.getLogger(__name__)
+
+
+def _env_choice(name: str, default: str, choices: tuple) -> str:
+    """Reads an enumerated setting, falling back to `default` when it is invalid."""
+    value = os.getenv(name, default).strip().lower()
+    if value not in choices:
+        logger.warning(
+            "Ignoring %s=%r, expected one of %s; using %r",
+            name,
+            value,
+            choices,
+            default,
+        )
+        return default
+    return value
+
 
 class GeminiConfig:
     MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-2.0-flash")
     API_KEY = os.getenv("GEMINI_API_KEY")
+    CHAT_CACHE_SIZE = int(os.getenv("GEMINI_CHAT_CACHE_SIZE", 1000))
+    CONTEXT_KEEP_TURNS = int(os.getenv("GEMINI_CONTEXT_KEEP_TURNS", 4))
+    CONTEXT_MAX_TURNS = int(os.getenv("GEMINI_CONTEXT_MAX_TURNS", 8))
+    CONTEXT_SUMMARY_WORDS = int(os.getenv("GEMINI_CONTEXT_SUMMARY_WORDS", 200))
 
 
 class RedisConfig:
@@ -14,8 +38,37 @@ class RedisConfig:
     TTL_SECONDS = int(os.getenv("REDIS_TTL_SECONDS", 3600))
 
 
+class ScheduleConfig:
+    TOP_K = int(os.getenv("SCHEDULE_TOP_K", 3))
+    MAX_SEARCH_NODES = int(os.getenv("SCHEDULE_MAX_SEARCH_NODES", 50000))
+    MAX_TOP_K = int(os.getenv("SCHEDULE_MAX_TOP_K", 10))
+
+
+class PromptConfig:
+    COURSE_FORMAT = _env_choice("PROMPT_COURSE_FORMAT", "table", COURSE_FORMATS)
+    DESCRIPTION_CHARS = int(os.getenv("PROMPT_DESCRIPTION_CHARS", 160))
+    TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 4000))
+
+
+class CacheConfig:
+    ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 6 * 3600))
+    MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+
+class AsyncServerConfig:
+    MAX_CONCURRENT_LLM_CALLS = int(os.getenv("ASYNC_MAX_CONCURRENT_LLM_CALLS", 200))
+    MAX_QUEUED_LLM_CALLS = int(os.getenv("ASYNC_MAX_QUEUED_LLM_CALLS", 400))
+    QUEUE_TIMEOUT_SECONDS = float(os.getenv("ASYNC_QUEUE_TIMEOUT_SECONDS", 5))
+    RETRY_AFTER_SECONDS = int(os.getenv("ASYNC_RETRY_AFTER_SECONDS", 5))
+
+
 class AppConfig:
     ENV = os.getenv("FLASK_ENV", "development")
     DEBUG = ENV == "development"
     GEMINI = GeminiConfig
     REDIS = RedisConfig
+    SCHEDULE = ScheduleConfig
+    PROMPT = PromptConfig
+    CACHE = CacheConfig
+    ASYNC_SERVER = AsyncServerConfig
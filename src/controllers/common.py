@@ -0,0 +1,195 @@
+"""
+Request parsing, validation and response building shared by the sync
+(planner.py) and async (planner_async.py) blueprints.
+
+The blueprints only differ in how they wait on Gemini and Redis; anything
+that decides what a request means or what the client gets back lives here.
+"""
+
+import json
+from http import HTTPStatus
+
+from src.config import AppConfig
+from src.external.context_window import context_stats
+from src.external.gemini_client import chat_cache
+from src.external.prompt_generator import PromptGenerator
+from src.models.chat import ChatHistoryResponse, ChatResponse, ErrorResponse
+from src.models.schedule import ScheduleResponse
+from src.services.catalog_store import catalog_store
+from src.services.response_cache import profile_cache_key
+
+
+class RequestError(Exception):
+    """A request the client has to fix; rendered as an ErrorResponse."""
+
+    def __init__(self, message: str, status: HTTPStatus = HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+    def response(self):
+        return error_response(str(self), self.status)
+
+
+def error_response(message: str, status: HTTPStatus):
+    return ErrorResponse(error=message).model_dump(), status
+
+
+def chat_response(response: str):
+    return ChatResponse(response=response).model_dump(), HTTPStatus.OK
+
+
+def parse_start_request(data: dict | None) -> tuple[str, str]:
+    data = data or {}
+    user_id = data.get("user_id")
+    user_input = data.get("user_input")
+    if not user_id or not user_input:
+        raise RequestError("user_id and message required")
+    return user_id, user_input
+
+
+def parse_continue_request(data: dict | None) -> tuple[str, str]:
+    data = data or {}
+    return data.get("user_id"), data.get("message")
+
+
+def require_history(history_length: int):
+    if not history_length:
+        raise RequestError("Invalid or missing chat history", HTTPStatus.NOT_FOUND)
+
+
+def parse_reset_request(data: dict | None) -> str:
+    return (data or {}).get("user_id")
+
+
+def reset_response(deleted: bool):
+    if not deleted:
+        return error_response("User session not found", HTTPStatus.NOT_FOUND)
+    return chat_response("Chat reset")
+
+
+def parse_history_request(args) -> tuple[str, int, int | None]:
+    user_id = args.get("user_id")
+    if not user_id:
+        raise RequestError("user_id is required")
+    offset = args.get("offset", 0, type=int)
+    limit = args.get("limit", type=int)
+    if offset < 0:
+        raise RequestError("offset must be a non-negative integer")
+    if limit is not None and limit < 1:
+        raise RequestError("limit must be a positive integer")
+    return user_id, offset, limit
+
+
+def history_response(user_id: str, history: list, total: int):
+    if not total:
+        raise RequestError("No chat history found for this user", HTTPStatus.NOT_FOUND)
+    response_model = ChatHistoryResponse(user_id=user_id, history=history, total=total)
+    return response_model.model_dump(), HTTPStatus.OK
+
+
+def parse_optimize_request(data: dict | None) -> tuple[str, int | None]:
+    data = data or {}
+    user_input = data.get("user_input")
+    if not user_input:
+        raise RequestError("user_input required")
+    return user_input, parse_top_k(data.get("top_k"))
+
+
+def parse_top_k(value) -> int | None:
+    """A positive integer capped at SCHEDULE_MAX_TOP_K; None keeps the default."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise RequestError("top_k must be a positive integer")
+    try:
+        top_k = int(value)
+    except (TypeError, ValueError):
+        raise RequestError("top_k must be a positive integer")
+    if top_k < 1:
+        raise RequestError("top_k must be a positive integer")
+    return min(top_k, AppConfig.SCHEDULE.MAX_TOP_K)
+
+
+def require_program(prompt_generator: PromptGenerator):
+    if not prompt_generator.program_name:
+        raise RequestError("Degree program not recognized")
+
+
+def schedule_response(prompt_generator: PromptGenerator, schedules: list):
+    response_model = ScheduleResponse(
+        program=prompt_generator.program_name,
+        max_credits=prompt_generator.prefs["max_credits"],
+        schedules=[s.to_dict() for s in schedules],
+    )
+    return response_model.model_dump(), HTTPStatus.OK
+
+
+def metrics(response_cache, **extra) -> dict:
+    return {
+        "catalog": catalog_store.stats(),
+        "response_cache": response_cache.stats(),
+        "chat_cache": chat_cache.stats(),
+        "context": context_stats.stats(),
+        **extra,
+    }
+
+
+def plan_cache_key(prompt_generator: PromptGenerator) -> str | None:
+    if not AppConfig.CACHE.ENABLED or not prompt_generator.program_name:
+        return None
+    return profile_cache_key(
+        prompt_generator.prefs,
+        prompt_generator.catalog.version,
+        AppConfig.GEMINI.MODEL_NAME,
+    )
+
+
+def session_prompt(client, prompt_generator: PromptGenerator) -> str:
+    if client is not None:
+        return client.get_history()[0]["parts"][0]
+    # Served from the cache: the prompt only depends on the cached profile,
+    # so rebuilding it gives the one the plan was generated from.
+    return prompt_generator.build_prompt()
+
+
+def is_first_follow_up(history_length: int) -> bool:
+    """The first follow-up is the turn that carries the student's opening words."""
+    return history_length == 2
+
+
+def updated_summary(client) -> dict | None:
+    """The summary to persist after a turn, None when it did not change."""
+    return client.summary.to_dict() if client.summary_updated else None
+
+
+def turn_messages(user_message: str, response: str) -> list:
+    return [
+        {"role": "user", "parts": [user_message]},
+        {"role": "model", "parts": [response]},
+    ]
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def sse_timing(timings) -> str:
+    """
+    Per-stage timings of a streamed turn, sent just before "done".
+
+    The Server-Timing header of a stream is written before the body runs,
+    so it never includes the Gemini call; this event carries the full
+    breakdown in milliseconds.
+    """
+    return sse_event("timing", timings.as_dict()) if timings is not None else ""
+
+
+def sse_done(response: str) -> str:
+    return sse_event("done", ChatResponse(response=response).model_dump())
+
+
+def sse_error(message: str) -> str:
+    return sse_event("error", ErrorResponse(error=message).model_dump())
+
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
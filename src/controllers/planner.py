@@ -1,127 +1,300 @@
-from flask import Blueprint, request
-from src.external.gemini_client import GeminiClient
+import logging
+import time
+
+from flask import Blueprint, Response, request, stream_with_context
+from src.external.gemini_client import GeminiClient, chat_cache
+from src.external.prompt_generator import PromptGenerator
 from src.config import AppConfig
-from src.models.chat import ChatResponse, ErrorResponse, ChatHistoryResponse
-from src.services.session_store import RedisSessionStore
+from src.services.session_store import RedisSessionStore, first_follow_up
+from src.services.response_cache import response_cache
+from src.services.timing import current_timings, resume
+from src.controllers.common import (
+    SSE_HEADERS,
+    RequestError,
+    chat_response,
+    error_response,
+    history_response,
+    is_first_follow_up,
+    metrics,
+    parse_continue_request,
+    parse_history_request,
+    parse_optimize_request,
+    parse_reset_request,
+    parse_start_request,
+    plan_cache_key,
+    require_history,
+    require_program,
+    reset_response,
+    schedule_response,
+    session_prompt,
+    sse_done,
+    sse_error,
+    sse_event,
+    sse_timing,
+    turn_messages,
+    updated_summary,
+)
 from http import HTTPStatus
 
 planner_bp = Blueprint("planner", __name__)
 
+logger = logging.getLogger(__name__)
+
 session_store = RedisSessionStore()
 
 
+def _new_client(history: list = None, chat=None, summary: dict = None) -> GeminiClient:
+    return GeminiClient(
+        api_key=AppConfig.GEMINI.API_KEY,
+        model_name=AppConfig.GEMINI.MODEL_NAME,
+        history=history,
+        chat=chat,
+        summary=summary,
+    )
+
+
+def _checkout_client(
+    user_id: str, session_id: str | None, history_length: int, summary: dict | None
+) -> tuple[GeminiClient, bool]:
+    chat = chat_cache.checkout(user_id, session_id, history_length)
+    if chat is not None:
+        return _new_client(chat=chat, summary=summary), True
+    history = session_store.get_gemini_history(user_id) or []
+    return _new_client(history=history, summary=summary), False
+
+
+def _upstream_message(user_id: str, history_length: int, message: str) -> str:
+    if not is_first_follow_up(history_length):
+        return message
+    opening, _ = session_store.get_history(user_id, limit=1)
+    return first_follow_up(opening[0]["parts"][0], message)
+
+
+def _finish_turn(
+    client: GeminiClient,
+    user_id: str,
+    session_id: str | None,
+    history_length: int,
+    messages,
+):
+    session_store.append_messages(user_id, messages, updated_summary(client))
+    chat_cache.checkin(user_id, client.chat, session_id, history_length + len(messages))
+
+
+def _start_session(
+    user_id: str, client, prompt_generator: PromptGenerator, user_input: str, response
+):
+    # Any live chat still cached belongs to the conversation being replaced.
+    chat_cache.discard(user_id)
+    session_id = session_store.start_session(
+        user_id,
+        session_prompt(client, prompt_generator),
+        turn_messages(user_input, response),
+    )
+    if client is not None:
+        chat_cache.checkin(user_id, client.chat, session_id)
+
+
+def _sse_response(events) -> Response:
+    timings = current_timings()
+
+    def resumed():
+        with resume(timings):
+            yield from events
+
+    return Response(
+        stream_with_context(resumed()),
+        mimetype="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @planner_bp.route("/start_chat", methods=["POST"])
 def start_chat():
-    data = request.get_json()
-    user_id = data.get("user_id")
-    user_input = data.get("user_input")
-
-    if not user_id or not user_input:
-        return (
-            ErrorResponse(error="user_id and message required").model_dump(),
-            HTTPStatus.BAD_REQUEST,
-        )
+    try:
+        user_id, user_input = parse_start_request(request.get_json())
+    except RequestError as e:
+        return e.response()
 
     try:
-        client = GeminiClient(
-            api_key=AppConfig.GEMINI.API_KEY, model_name=AppConfig.GEMINI.MODEL_NAME
-        )
-        response = client.start_conversation(user_input)
+        prompt_generator = PromptGenerator(user_input)
+        client = None
 
-        session_store.set_session(
-            user_id,
-            {
-                "raw_history": [
-                    {"role": "user", "parts": [user_input]},
-                    {"role": "model", "parts": [response]},
-                ],
-                "gemini_history": client.get_history(),
-            },
-        )
+        def generate_plan():
+            nonlocal client
+            client = _new_client()
+            return client.start_conversation(user_input, prompt_generator)
+
+        cache_key = plan_cache_key(prompt_generator)
+        if cache_key:
+            response, _ = response_cache.get_or_compute(cache_key, generate_plan)
+        else:
+            response = generate_plan()
 
-        return ChatResponse(response=response).model_dump(), HTTPStatus.OK
+        _start_session(user_id, client, prompt_generator, user_input, response)
+
+        return chat_response(response)
     except Exception as e:
-        return (
-            ErrorResponse(error=f"Something went wrong {e}").model_dump(),
-            HTTPStatus.INTERNAL_SERVER_ERROR,
+        return error_response(
+            f"Something went wrong {e}", HTTPStatus.INTERNAL_SERVER_ERROR
         )
 
 
 @planner_bp.route("/continue_chat", methods=["POST"])
 def continue_chat():
-    data = request.get_json()
-    user_id = data.get("user_id")
-    message = data.get("message")
-
-    history = session_store.get_session(user_id)
-    if not history:
-        return (
-            ErrorResponse(error="Invalid or missing chat history").model_dump(),
-            HTTPStatus.NOT_FOUND,
-        )
+    user_id, message = parse_continue_request(request.get_json())
 
+    history_length, summary, session_id = session_store.session_state(user_id)
     try:
-        gemini_history = history.get("gemini_history", [])
-        raw_history = history.get("raw_history", [])
+        require_history(history_length)
+    except RequestError as e:
+        return e.response()
 
-        client = GeminiClient(
-            api_key=AppConfig.GEMINI.API_KEY,
-            model_name=AppConfig.GEMINI.MODEL_NAME,
-            history=gemini_history,
+    try:
+        started = time.perf_counter()
+        client, reused = _checkout_client(user_id, session_id, history_length, summary)
+        response = client.continue_conversation(
+            _upstream_message(user_id, history_length, message)
         )
-        response = client.continue_conversation(message)
 
-        raw_history.append({"role": "user", "parts": [message]})
-        raw_history.append({"role": "model", "parts": [response]})
-
-        session_store.set_session(
+        _finish_turn(
+            client,
+            user_id,
+            session_id,
+            history_length,
+            turn_messages(message, response),
+        )
+        logger.info(
+            "continue_chat turn for %s took %.3fs (live chat %s, ~%d context tokens)",
             user_id,
-            {"raw_history": raw_history, "gemini_history": client.get_history()},
+            time.perf_counter() - started,
+            "reused" if reused else "rehydrated",
+            client.context_tokens,
         )
-        return ChatResponse(response=response).model_dump(), HTTPStatus.OK
+        return chat_response(response)
     except Exception as e:
-        return (
-            ErrorResponse(error=f"Something went wrong {e}").model_dump(),
-            HTTPStatus.INTERNAL_SERVER_ERROR,
+        return error_response(
+            f"Something went wrong {e}", HTTPStatus.INTERNAL_SERVER_ERROR
         )
 
 
+@planner_bp.route("/start_chat/stream", methods=["POST"])
+def start_chat_stream():
+    try:
+        user_id, user_input = parse_start_request(request.get_json())
+    except RequestError as e:
+        return e.response()
+
+    def events():
+        try:
+            prompt_generator = PromptGenerator(user_input)
+            cache_key = plan_cache_key(prompt_generator)
+            response = response_cache.get(cache_key) if cache_key else None
+            client = None
+
+            if response is not None:
+                yield sse_event("chunk", {"text": response})
+            else:
+                client = _new_client()
+                chunks = []
+                for chunk in client.start_conversation_stream(
+                    user_input, prompt_generator
+                ):
+                    chunks.append(chunk)
+                    yield sse_event("chunk", {"text": chunk})
+                response = "".join(chunks).strip()
+                if cache_key:
+                    response_cache.set(cache_key, response)
+
+            _start_session(user_id, client, prompt_generator, user_input, response)
+            yield sse_timing(current_timings())
+            yield sse_done(response)
+        except Exception as e:
+            yield sse_error(f"Something went wrong {e}")
+
+    return _sse_response(events())
+
+
+@planner_bp.route("/continue_chat/stream", methods=["POST"])
+def continue_chat_stream():
+    user_id, message = parse_continue_request(request.get_json())
+
+    history_length, summary, session_id = session_store.session_state(user_id)
+    try:
+        require_history(history_length)
+    except RequestError as e:
+        return e.response()
+
+    def events():
+        try:
+            client, _ = _checkout_client(user_id, session_id, history_length, summary)
+            chunks = []
+            for chunk in client.continue_conversation_stream(
+                _upstream_message(user_id, history_length, message)
+            ):
+                chunks.append(chunk)
+                yield sse_event("chunk", {"text": chunk})
+            response = "".join(chunks).strip()
+
+            _finish_turn(
+                client,
+                user_id,
+                session_id,
+                history_length,
+                turn_messages(message, response),
+            )
+            yield sse_timing(current_timings())
+            yield sse_done(response)
+        except Exception as e:
+            yield sse_error(f"Something went wrong {e}")
+
+    return _sse_response(events())
+
+
 @planner_bp.route("/reset_chat", methods=["POST"])
 def reset_chat():
-    data = request.get_json()
-    user_id = data.get("user_id")
+    user_id = parse_reset_request(request.get_json())
 
-    if session_store.get_session(user_id):
-        session_store.delete_session(user_id)
-        return ChatResponse(response="Chat reset").model_dump(), HTTPStatus.OK
-
-    return (
-        ErrorResponse(error="User session not found").model_dump(),
-        HTTPStatus.NOT_FOUND,
-    )
+    deleted = session_store.delete_session(user_id)
+    if deleted:
+        chat_cache.discard(user_id)
+    return reset_response(deleted)
 
 
 @planner_bp.route("/chat_history", methods=["GET"])
 def get_chat_history():
-    user_id = request.args.get("user_id")
-    if not user_id:
-        return (
-            ErrorResponse(error="user_id is required").model_dump(),
-            HTTPStatus.BAD_REQUEST,
+    try:
+        user_id, offset, limit = parse_history_request(request.args)
+        history, total = session_store.get_history(user_id, offset=offset, limit=limit)
+        return history_response(user_id, history, total)
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(
+            f"Failed to retrieve chat history: {e}", HTTPStatus.INTERNAL_SERVER_ERROR
         )
 
+
+@planner_bp.route("/optimize_schedule", methods=["POST"])
+def optimize_schedule():
     try:
-        history = session_store.get_raw_history(user_id)
-        if not history:
-            return (
-                ErrorResponse(error="No chat history found for this user").model_dump(),
-                HTTPStatus.NOT_FOUND,
-            )
+        user_input, top_k = parse_optimize_request(request.get_json())
+    except RequestError as e:
+        return e.response()
 
-        response_model = ChatHistoryResponse(user_id=user_id, history=history)
-        return response_model.model_dump(), HTTPStatus.OK
+    try:
+        prompt_generator = PromptGenerator(user_input)
+        require_program(prompt_generator)
+        schedules = prompt_generator.build_schedules(top_k)
+        return schedule_response(prompt_generator, schedules)
+    except RequestError as e:
+        return e.response()
     except Exception as e:
-        return (
-            ErrorResponse(error=f"Failed to retrieve chat history: {e}").model_dump(),
-            HTTPStatus.INTERNAL_SERVER_ERROR,
+        return error_response(
+            f"Failed to build schedules: {e}", HTTPStatus.INTERNAL_SERVER_ERROR
         )
+
+
+@planner_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    return metrics(response_cache), HTTPStatus.OK
@@ -0,0 +1,341 @@
+import asyncio
+from http import HTTPStatus
+
+from quart import Blueprint, Response, request
+
+from src.config import AppConfig
+from src.controllers.common import (
+    SSE_HEADERS,
+    RequestError,
+    chat_response,
+    error_response,
+    history_response,
+    is_first_follow_up,
+    metrics,
+    parse_continue_request,
+    parse_history_request,
+    parse_optimize_request,
+    parse_reset_request,
+    parse_start_request,
+    plan_cache_key,
+    require_history,
+    require_program,
+    reset_response,
+    schedule_response,
+    session_prompt,
+    sse_done,
+    sse_error,
+    sse_event,
+    sse_timing,
+    turn_messages,
+    updated_summary,
+)
+from src.external.gemini_client import AsyncGeminiClient, chat_cache
+from src.external.prompt_generator import PromptGenerator
+from src.services.concurrency import UpstreamLimiter, UpstreamSaturated
+from src.services.response_cache import response_cache
+from src.services.session_store import AsyncRedisSessionStore, first_follow_up
+from src.services.timing import current_timings, resume
+
+planner_async_bp = Blueprint("planner_async", __name__)
+
+session_store = AsyncRedisSessionStore()
+
+upstream_limiter = UpstreamLimiter(
+    max_concurrent=AppConfig.ASYNC_SERVER.MAX_CONCURRENT_LLM_CALLS,
+    max_queued=AppConfig.ASYNC_SERVER.MAX_QUEUED_LLM_CALLS,
+    max_wait_seconds=AppConfig.ASYNC_SERVER.QUEUE_TIMEOUT_SECONDS,
+    retry_after=AppConfig.ASYNC_SERVER.RETRY_AFTER_SECONDS,
+)
+
+
+def _saturated_response(e: UpstreamSaturated):
+    body, status = error_response(str(e), HTTPStatus.TOO_MANY_REQUESTS)
+    return body, status, {"Retry-After": str(e.retry_after)}
+
+
+def _new_client(
+    history: list = None, chat=None, summary: dict = None
+) -> AsyncGeminiClient:
+    return AsyncGeminiClient(
+        api_key=AppConfig.GEMINI.API_KEY,
+        model_name=AppConfig.GEMINI.MODEL_NAME,
+        history=history,
+        chat=chat,
+        summary=summary,
+    )
+
+
+async def _prepare_prompt(user_input: str) -> PromptGenerator:
+    """
+    Parses the input and builds the prompt off the event loop.
+
+    Both can reload the catalog from disk and run the schedule search;
+    the built prompt is kept on the generator for the later calls.
+    """
+
+    def prepare():
+        prompt_generator = PromptGenerator(user_input)
+        prompt_generator.build_prompt()
+        return prompt_generator
+
+    return await asyncio.to_thread(prepare)
+
+
+async def _checkout_client(
+    user_id: str, session_id: str | None, history_length: int, summary: dict | None
+) -> AsyncGeminiClient:
+    chat = chat_cache.checkout(user_id, session_id, history_length)
+    if chat is not None:
+        return _new_client(chat=chat, summary=summary)
+    history = await session_store.get_gemini_history(user_id) or []
+    return _new_client(history=history, summary=summary)
+
+
+async def _upstream_message(user_id: str, history_length: int, message: str) -> str:
+    if not is_first_follow_up(history_length):
+        return message
+    opening, _ = await session_store.get_history(user_id, limit=1)
+    return first_follow_up(opening[0]["parts"][0], message)
+
+
+async def _finish_turn(
+    client: AsyncGeminiClient,
+    user_id: str,
+    session_id: str | None,
+    history_length: int,
+    messages,
+):
+    await session_store.append_messages(user_id, messages, updated_summary(client))
+    chat_cache.checkin(user_id, client.chat, session_id, history_length + len(messages))
+
+
+async def _start_session(
+    user_id: str, client, prompt_generator: PromptGenerator, user_input: str, response
+):
+    # Any live chat still cached belongs to the conversation being replaced.
+    chat_cache.discard(user_id)
+    session_id = await session_store.start_session(
+        user_id,
+        session_prompt(client, prompt_generator),
+        turn_messages(user_input, response),
+    )
+    if client is not None:
+        chat_cache.checkin(user_id, client.chat, session_id)
+
+
+def _sse_response(events) -> Response:
+    timings = current_timings()
+
+    async def resumed():
+        with resume(timings):
+            async for event in events:
+                yield event
+
+    return Response(resumed(), mimetype="text/event-stream", headers=SSE_HEADERS)
+
+
+@planner_async_bp.route("/start_chat", methods=["POST"])
+async def start_chat():
+    try:
+        user_id, user_input = parse_start_request(await request.get_json())
+    except RequestError as e:
+        return e.response()
+
+    try:
+        prompt_generator = await _prepare_prompt(user_input)
+        client = None
+
+        async def generate_plan():
+            nonlocal client
+            async with upstream_limiter.slot():
+                client = _new_client()
+                return await client.start_conversation(user_input, prompt_generator)
+
+        cache_key = plan_cache_key(prompt_generator)
+        if cache_key:
+            response, _ = await response_cache.get_or_compute_async(
+                cache_key, generate_plan
+            )
+        else:
+            response = await generate_plan()
+
+        await _start_session(user_id, client, prompt_generator, user_input, response)
+
+        return chat_response(response)
+    except UpstreamSaturated as e:
+        return _saturated_response(e)
+    except Exception as e:
+        return error_response(
+            f"Something went wrong {e}", HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+
+@planner_async_bp.route("/continue_chat", methods=["POST"])
+async def continue_chat():
+    user_id, message = parse_continue_request(await request.get_json())
+
+    history_length, summary, session_id = await session_store.session_state(user_id)
+    try:
+        require_history(history_length)
+    except RequestError as e:
+        return e.response()
+
+    try:
+        async with upstream_limiter.slot():
+            client = await _checkout_client(
+                user_id, session_id, history_length, summary
+            )
+            response = await client.continue_conversation(
+                await _upstream_message(user_id, history_length, message)
+            )
+
+        await _finish_turn(
+            client,
+            user_id,
+            session_id,
+            history_length,
+            turn_messages(message, response),
+        )
+        return chat_response(response)
+    except UpstreamSaturated as e:
+        return _saturated_response(e)
+    except Exception as e:
+        return error_response(
+            f"Something went wrong {e}", HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+
+# The streaming routes take their upstream slot inside the body generator,
+# so a response that is never iterated holds nothing. Saturation therefore
+# arrives as an "error" event rather than a 429.
+
+
+@planner_async_bp.route("/start_chat/stream", methods=["POST"])
+async def start_chat_stream():
+    try:
+        user_id, user_input = parse_start_request(await request.get_json())
+    except RequestError as e:
+        return e.response()
+
+    async def events():
+        try:
+            prompt_generator = await _prepare_prompt(user_input)
+            cache_key = plan_cache_key(prompt_generator)
+            response = await response_cache.get_async(cache_key) if cache_key else None
+            client = None
+
+            if response is not None:
+                yield sse_event("chunk", {"text": response})
+            else:
+                async with upstream_limiter.slot():
+                    client = _new_client()
+                    chunks = []
+                    async for chunk in client.start_conversation_stream(
+                        user_input, prompt_generator
+                    ):
+                        chunks.append(chunk)
+                        yield sse_event("chunk", {"text": chunk})
+                response = "".join(chunks).strip()
+                if cache_key:
+                    await response_cache.set_async(cache_key, response)
+
+            await _start_session(
+                user_id, client, prompt_generator, user_input, response
+            )
+            yield sse_timing(current_timings())
+            yield sse_done(response)
+        except Exception as e:
+            yield sse_error(f"Something went wrong {e}")
+
+    return _sse_response(events())
+
+
+@planner_async_bp.route("/continue_chat/stream", methods=["POST"])
+async def continue_chat_stream():
+    user_id, message = parse_continue_request(await request.get_json())
+
+    history_length, summary, session_id = await session_store.session_state(user_id)
+    try:
+        require_history(history_length)
+    except RequestError as e:
+        return e.response()
+
+    async def events():
+        try:
+            async with upstream_limiter.slot():
+                client = await _checkout_client(
+                    user_id, session_id, history_length, summary
+                )
+                chunks = []
+                async for chunk in client.continue_conversation_stream(
+                    await _upstream_message(user_id, history_length, message)
+                ):
+                    chunks.append(chunk)
+                    yield sse_event("chunk", {"text": chunk})
+            response = "".join(chunks).strip()
+
+            await _finish_turn(
+                client,
+                user_id,
+                session_id,
+                history_length,
+                turn_messages(message, response),
+            )
+            yield sse_timing(current_timings())
+            yield sse_done(response)
+        except Exception as e:
+            yield sse_error(f"Something went wrong {e}")
+
+    return _sse_response(events())
+
+
+@planner_async_bp.route("/reset_chat", methods=["POST"])
+async def reset_chat():
+    user_id = parse_reset_request(await request.get_json())
+
+    deleted = await session_store.delete_session(user_id)
+    if deleted:
+        chat_cache.discard(user_id)
+    return reset_response(deleted)
+
+
+@planner_async_bp.route("/chat_history", methods=["GET"])
+async def get_chat_history():
+    try:
+        user_id, offset, limit = parse_history_request(request.args)
+        history, total = await session_store.get_history(
+            user_id, offset=offset, limit=limit
+        )
+        return history_response(user_id, history, total)
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(
+            f"Failed to retrieve chat history: {e}", HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+
+@planner_async_bp.route("/optimize_schedule", methods=["POST"])
+async def optimize_schedule():
+    try:
+        user_input, top_k = parse_optimize_request(await request.get_json())
+    except RequestError as e:
+        return e.response()
+
+    try:
+        prompt_generator = await asyncio.to_thread(PromptGenerator, user_input)
+        require_program(prompt_generator)
+        schedules = await asyncio.to_thread(prompt_generator.build_schedules, top_k)
+        return schedule_response(prompt_generator, schedules)
+    except RequestError as e:
+        return e.response()
+    except Exception as e:
+        return error_response(
+            f"Failed to build schedules: {e}", HTTPStatus.INTERNAL_SERVER_ERROR
+        )
+
+
+@planner_async_bp.route("/metrics", methods=["GET"])
+async def get_metrics():
+    return metrics(response_cache, upstream=upstream_limiter.stats()), HTTPStatus.OK
@@ -1,2 +1,2 @@
-from .gemini_client import GeminiClient
+from .gemini_client import AsyncGeminiClient, GeminiClient
 from .prompt_generator import PromptGenerator
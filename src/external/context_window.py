@@ -0,0 +1,133 @@
+import threading
+from dataclasses import asdict, dataclass
+
+from src.config import AppConfig
+from src.services.course_encoder import estimate_tokens
+
+SUMMARY_PREFIX = "Summary of our conversation so far:"
+SUMMARY_ACK = "Understood, I will keep that in mind."
+
+SUMMARY_INSTRUCTIONS = (
+    "You keep running notes for an academic advising chat. Rewrite the notes "
+    "so they also cover the new messages below. Keep every course code, the "
+    "student's decisions, constraints and open questions; drop pleasantries. "
+    "Answer with the notes only, at most {words} words."
+)
+
+
+@dataclass(frozen=True)
+class ConversationSummary:
+    text: str = ""
+    # Turns after the opening exchange that `text` stands in for.
+    turns: int = 0
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "ConversationSummary":
+        return cls(**data) if data else cls()
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def history_tokens(history: list) -> int:
+    return sum(
+        estimate_tokens(part) for message in history for part in message["parts"]
+    )
+
+
+@dataclass(frozen=True)
+class ContextPolicy:
+    """
+    Decides which part of a conversation is replayed to Gemini.
+
+    The opening exchange (planning prompt and first plan) is always kept,
+    followed by the running summary, followed by the most recent turns
+    verbatim. Once more than `max_turns` turns sit outside the summary, all
+    but the last `keep_turns` are folded into it, so the summary is only
+    regenerated every `max_turns - keep_turns` turns.
+    """
+
+    keep_turns: int = 4
+    max_turns: int = 8
+    summary_words: int = 200
+
+    def __post_init__(self):
+        if self.keep_turns < 1 or self.max_turns < self.keep_turns:
+            raise ValueError("Context policy needs 1 <= keep_turns <= max_turns")
+
+    @classmethod
+    def from_config(cls) -> "ContextPolicy":
+        return cls(
+            keep_turns=AppConfig.GEMINI.CONTEXT_KEEP_TURNS,
+            max_turns=AppConfig.GEMINI.CONTEXT_MAX_TURNS,
+            summary_words=AppConfig.GEMINI.CONTEXT_SUMMARY_WORDS,
+        )
+
+    def window(self, history: list, summary: ConversationSummary) -> list:
+        """Windowed Gemini history from the full stored one."""
+        anchor, rest = history[:2], history[2 + 2 * summary.turns :]
+        return anchor + summary_messages(summary) + rest
+
+    def recent(self, windowed: list, summary: ConversationSummary) -> list:
+        """Verbatim turns of a windowed history, without anchor and summary."""
+        return windowed[2 + len(summary_messages(summary)) :]
+
+    def overflow(self, windowed: list, summary: ConversationSummary) -> list:
+        """Messages to fold into the summary, empty while the window fits."""
+        recent = self.recent(windowed, summary)
+        if len(recent) <= 2 * self.max_turns:
+            return []
+        return recent[: len(recent) - 2 * self.keep_turns]
+
+    def summary_prompt(self, summary: ConversationSummary, messages: list) -> str:
+        lines = [SUMMARY_INSTRUCTIONS.format(words=self.summary_words), ""]
+        lines.append(f"Current notes: {summary.text or '(none yet)'}")
+        lines.append("")
+        lines.append("New messages:")
+        for message in messages:
+            lines.append(f"{message['role']}: {' '.join(message['parts'])}")
+        return "\n".join(lines)
+
+
+def summary_messages(summary: ConversationSummary) -> list:
+    if not summary.text:
+        return []
+    return [
+        {"role": "user", "parts": [f"{SUMMARY_PREFIX} {summary.text}"]},
+        {"role": "model", "parts": [SUMMARY_ACK]},
+    ]
+
+
+class ContextStats:
+    """Process-wide counters of what each turn sends upstream."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.summaries = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+        self.last_tokens = 0
+
+    def record_turn(self, tokens: int):
+        with self._lock:
+            self.turns += 1
+            self.total_tokens += tokens
+            self.max_tokens = max(self.max_tokens, tokens)
+            self.last_tokens = tokens
+
+    def record_summary(self):
+        with self._lock:
+            self.summaries += 1
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turns,
+            "summaries": self.summaries,
+            "avg_tokens": round(self.total_tokens / self.turns) if self.turns else 0,
+            "max_tokens": self.max_tokens,
+            "last_tokens": self.last_tokens,
+        }
+
+
+context_stats = ContextStats()
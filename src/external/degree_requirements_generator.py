@@ -8,6 +8,8 @@ import pytesseract
 from tempfile import NamedTemporaryFile
 from bs4 import BeautifulSoup
 
+from src.utils.files import write_json_atomic
+
 
 class DegreeRequirementsExtractor:
     class DegreeRequirementsExtractor:
@@ -55,8 +57,7 @@ class DegreeRequirementsExtractor:
                 all_data = {}
 
         all_data[slug] = entry
-        with open(self.output_path, "w", encoding="utf-8") as f:
-            json.dump(all_data, f, indent=2, ensure_ascii=False)
+        write_json_atomic(self.output_path, all_data)
 
     def extract_from_pdf_url(self, slug, url, program_name=None):
         try:
@@ -0,0 +1,333 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from io import BytesIO
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+import requests
+from bs4 import BeautifulSoup
+
+from src.utils.files import write_json_atomic
+
+logger = logging.getLogger(__name__)
+
+SOURCE_KINDS = ("pdf", "image", "webpage")
+
+DEFAULT_OUTPUT_PATH = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        "..",
+        "data",
+        "requirements",
+        "degree_requirements.json",
+    )
+)
+
+
+@dataclass(frozen=True)
+class RequirementSource:
+    slug: str
+    url: str
+    kind: str
+    program: str = None
+
+    @property
+    def program_name(self) -> str:
+        return self.program or self.slug.replace("_", " ").title()
+
+
+def load_sources(path: str) -> list:
+    """
+    Reads the sources file: {slug: {"url": ..., "kind": ..., "program": ...}}.
+
+    `kind` is one of SOURCE_KINDS; `program` defaults to the title-cased
+    slug like the entries DegreeRequirementsExtractor writes. `url` may be
+    an http(s) URL, a file:// URL or a local path.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    sources = []
+    for slug, spec in raw.items():
+        if spec.get("kind") not in SOURCE_KINDS:
+            raise ValueError(f"Source {slug} has unknown kind {spec.get('kind')!r}")
+        sources.append(
+            RequirementSource(
+                slug=slug,
+                url=spec["url"],
+                kind=spec["kind"],
+                program=spec.get("program"),
+            )
+        )
+    return sources
+
+
+def extract_pdf_text(content: bytes) -> str:
+    import fitz
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+
+def extract_image_text(content: bytes) -> str:
+    import pytesseract
+    from PIL import Image
+
+    return pytesseract.image_to_string(Image.open(BytesIO(content)))
+
+
+def extract_webpage_text(content: bytes) -> str:
+    soup = BeautifulSoup(content, "html.parser")
+    return "\n".join(
+        p.get_text(strip=True) for p in soup.find_all("p") if p.get_text(strip=True)
+    )
+
+
+EXTRACTORS = {
+    "pdf": extract_pdf_text,
+    "image": extract_image_text,
+    "webpage": extract_webpage_text,
+}
+
+
+def extract_text(kind: str, content: bytes) -> str:
+    # Module-level so it can be pickled into worker processes.
+    return EXTRACTORS[kind](content)
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def manifest_path_for(output_path: str) -> str:
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.manifest{ext}"
+
+
+@dataclass
+class FetchResult:
+    source: RequirementSource
+    content: bytes = None
+    etag: str = None
+    last_modified: str = None
+    not_modified: bool = False
+
+
+@dataclass
+class IngestReport:
+    extracted: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.extracted)} extracted, {len(self.unchanged)} unchanged, "
+            f"{len(self.failed)} failed in {self.seconds:.1f}s"
+        )
+
+
+class _Done:
+    """Future-like wrapper for extraction run inline when the pool is disabled."""
+
+    def __init__(self, kind: str, content: bytes):
+        try:
+            self._value, self._error = extract_text(kind, content), None
+        except Exception as e:
+            self._value, self._error = None, e
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class RequirementsIngestor:
+    """
+    Batch ingestion of degree requirements from their source documents.
+
+    Sources are downloaded on a thread pool with conditional requests, and
+    PDF and OCR extraction run on a process pool as soon as each download
+    finishes. A source whose ETag, Last-Modified or content hash matches the
+    manifest from the previous run keeps its existing entry. Entries of
+    failed sources are kept as well. The output and the manifest are each
+    written once at the end.
+    """
+
+    def __init__(
+        self,
+        output_path: str = DEFAULT_OUTPUT_PATH,
+        manifest_path: str = None,
+        fetch_workers: int = 8,
+        extract_workers: int = None,
+        timeout: float = 30,
+    ):
+        self.output_path = output_path
+        self.manifest_path = manifest_path or manifest_path_for(output_path)
+        self.fetch_workers = fetch_workers
+        # 0 extracts in-process, None sizes the pool to the CPU count.
+        self.extract_workers = extract_workers
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # Sessions are not safe to share between threads; keep one per worker.
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def fetch(self, source: RequirementSource, previous: dict) -> FetchResult:
+        parsed = urlparse(source.url)
+        if parsed.scheme in ("", "file"):
+            path = url2pathname(parsed.path) if parsed.scheme else source.url
+            with open(path, "rb") as f:
+                return FetchResult(source, content=f.read())
+
+        headers = {}
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        response = self._session().get(
+            source.url, headers=headers, timeout=self.timeout
+        )
+        if response.status_code == 304:
+            return FetchResult(source, not_modified=True)
+        response.raise_for_status()
+        return FetchResult(
+            source,
+            content=response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+    def _extract_pool(self):
+        if self.extract_workers == 0:
+            return None
+        return ProcessPoolExecutor(max_workers=self.extract_workers)
+
+    def run(self, sources: list, force: bool = False) -> IngestReport:
+        started = time.perf_counter()
+        existing = _read_json(self.output_path)
+        manifest = _read_json(self.manifest_path)
+        entries = dict(existing)
+        report = IngestReport()
+
+        def previous_for(source: RequirementSource) -> dict:
+            previous = manifest.get(source.slug, {})
+            # Without a stored entry there is nothing to fall back on.
+            if (
+                force
+                or source.slug not in existing
+                or previous.get("url") != source.url
+            ):
+                return {}
+            return previous
+
+        pool = self._extract_pool()
+        extractions = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as fetchers:
+                fetches = {
+                    fetchers.submit(self.fetch, source, previous_for(source)): source
+                    for source in sources
+                }
+                for future in as_completed(fetches):
+                    source = fetches[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning("Failed to fetch %s: %s", source.slug, e)
+                        report.failed[source.slug] = str(e)
+                        continue
+
+                    previous = previous_for(source)
+                    if result.not_modified:
+                        report.unchanged.append(source.slug)
+                        continue
+                    digest = hashlib.sha256(result.content).hexdigest()
+                    manifest[source.slug] = {
+                        "url": source.url,
+                        "kind": source.kind,
+                        "etag": result.etag,
+                        "last_modified": result.last_modified,
+                        "sha256": digest,
+                    }
+                    if previous.get("sha256") == digest:
+                        report.unchanged.append(source.slug)
+                        continue
+
+                    if pool is None:
+                        extractions[source.slug] = _Done(source.kind, result.content)
+                    else:
+                        extractions[source.slug] = pool.submit(
+                            extract_text, source.kind, result.content
+                        )
+
+            by_slug = {source.slug: source for source in sources}
+            for slug, future in extractions.items():
+                try:
+                    raw_text = future.result()
+                except Exception as e:
+                    logger.warning("Failed to extract %s: %s", slug, e)
+                    report.failed[slug] = str(e)
+                    manifest.pop(slug, None)
+                    continue
+                entries[slug] = {
+                    "program": by_slug[slug].program_name,
+                    "raw_text": raw_text,
+                }
+                report.extracted.append(slug)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        if report.extracted:
+            write_json_atomic(self.output_path, entries)
+        write_json_atomic(self.manifest_path, manifest)
+        report.seconds = time.perf_counter() - started
+        logger.info("Degree requirements ingestion: %s", report.summary())
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Fetch and extract degree requirements for every listed program."
+    )
+    parser.add_argument("--sources", required=True, help="JSON file of sources")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    parser.add_argument("--manifest", default=None)
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--extract-workers", type=int, default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="Re-extract sources even if unchanged"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    ingestor = RequirementsIngestor(
+        output_path=args.output,
+        manifest_path=args.manifest,
+        fetch_workers=args.fetch_workers,
+        extract_workers=args.extract_workers,
+    )
+    report = ingestor.run(load_sources(args.sources), force=args.force)
+    for slug, error in sorted(report.failed.items()):
+        print(f"Failed {slug}: {error}")
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,50 +1,243 @@
-from google import generativeai as genai
+import logging
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator
+
 from google.api_core.exceptions import GoogleAPIError
+
+from src.config import AppConfig
+from src.services.course_encoder import estimate_tokens
+from src.services.timing import stage, timed, timed_aiter, timed_iter
+from .context_window import (
+    ContextPolicy,
+    ConversationSummary,
+    context_stats,
+    history_tokens,
+    summary_messages,
+)
+from .gemini_pool import ChatCache, get_model
 from .prompt_generator import PromptGenerator
 
+logger = logging.getLogger(__name__)
+
+chat_cache = ChatCache(AppConfig.GEMINI.CHAT_CACHE_SIZE)
+
+
+def _reported_tokens(response) -> int | None:
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "prompt_token_count", None) or None
+
+
+@contextmanager
+def _upstream_errors(action: str):
+    """Re-raises anything from a Gemini call as the RuntimeError callers expect."""
+    try:
+        yield
+    except GoogleAPIError as e:
+        raise RuntimeError(f"Google API error: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Failed to {action}: {e}")
+
+
+class _GeminiClientBase:
+    """
+    Wraps one Gemini chat session.
+
+    `history` is the full stored conversation; only the window chosen by
+    `context_policy` around `summary` is replayed upstream. When a turn
+    would overflow the window, older turns are folded into a new summary
+    first and `summary_updated` is set so the caller can persist it.
+
+    Everything that does not wait on the network lives here;
+    GeminiClient and AsyncGeminiClient only differ in how they call it.
+    """
 
-class GeminiClient:
     def __init__(
         self,
         api_key: str,
         model_name: str = "gemini-2.0-flash",
         history: list = None,
+        chat=None,
+        summary: dict = None,
+        context_policy: ContextPolicy = None,
     ):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel(model_name)
-        self.chat = self.model.start_chat(history=history or [])
+        self.model = get_model(api_key, model_name)
+        self.context_policy = context_policy or ContextPolicy.from_config()
+        self.summary = ConversationSummary.from_dict(summary)
+        self.summary_updated = False
+        self.context_tokens = 0
+        if chat is not None:
+            self.chat = chat
+        else:
+            self.chat = self.model.start_chat(
+                history=self.context_policy.window(history or [], self.summary)
+            )
 
-    def start_conversation(self, user_input: str) -> str:
-        try:
+    def _ensure_chat(self):
+        if not self.chat:
+            self.chat = self.model.start_chat()
+
+    def _opening_prompt(
+        self, user_input: str, prompt_generator: PromptGenerator = None
+    ) -> str:
+        self.chat = self.model.start_chat()
+        prompt_generator = prompt_generator or PromptGenerator(user_input)
+        return prompt_generator.build_prompt()
+
+    def _overflow(self) -> tuple[list, list]:
+        history = self.get_history()
+        return history, self.context_policy.overflow(history, self.summary)
+
+    def _fold_into_summary(self, history: list, overflow: list, text: str):
+        recent = self.context_policy.recent(history, self.summary)
+        self.summary = ConversationSummary(
+            text=text, turns=self.summary.turns + len(overflow) // 2
+        )
+        self.summary_updated = True
+        self.chat = self.model.start_chat(
+            history=history[:2]
+            + summary_messages(self.summary)
+            + recent[len(overflow) :]
+        )
+        context_stats.record_summary()
+
+    def _record_context(self, message: str) -> int:
+        self.context_tokens = history_tokens(self.get_history()) + estimate_tokens(
+            message
+        )
+        context_stats.record_turn(self.context_tokens)
+        return self.context_tokens
+
+    def _log_turn(self, started: float, tokens: int, response):
+        logger.info(
+            "Gemini turn took %.3fs with %d prior messages, ~%d tokens "
+            "(%s reported)",
+            time.perf_counter() - started,
+            len(self.chat.history) - 2,
+            tokens,
+            _reported_tokens(response),
+        )
+
+    def _log_streamed_turn(self, tokens: int, response):
+        logger.info(
+            "Gemini streamed turn sent ~%d tokens (%s reported)",
+            tokens,
+            _reported_tokens(response),
+        )
+
+    def start_conversation_stream(
+        self, user_input: str, prompt_generator: PromptGenerator = None
+    ):
+        return self.stream_message(self._opening_prompt(user_input, prompt_generator))
+
+    def continue_conversation_stream(self, follow_up_message: str):
+        return self.stream_message(follow_up_message)
+
+    def reset_chat(self):
+        with _upstream_errors("reset chat"):
             self.chat = self.model.start_chat()
-            prompt_generator = PromptGenerator(user_input)
-            prompt = prompt_generator.build_prompt()
-            return self.send_message(prompt)
+
+    def get_history(self):
+        return [
+            {"role": msg.role, "parts": [part.text for part in msg.parts]}
+            for msg in self.chat.history
+        ]
+
+
+class GeminiClient(_GeminiClientBase):
+    """Blocking client for the Flask blueprint."""
+
+    def _fit_context(self):
+        history, overflow = self._overflow()
+        if not overflow:
+            return
+        try:
+            prompt = self.context_policy.summary_prompt(self.summary, overflow)
+            text = self.model.generate_content(prompt).text.strip()
         except Exception as e:
-            raise RuntimeError(f"Failed to start conversation: {e}")
+            # A missed compaction only costs tokens; retry on the next turn.
+            logger.warning("Failed to summarize conversation: %s", e)
+            return
+        self._fold_into_summary(history, overflow, text)
+
+    def start_conversation(
+        self, user_input: str, prompt_generator: PromptGenerator = None
+    ) -> str:
+        with _upstream_errors("start conversation"):
+            return self.send_message(self._opening_prompt(user_input, prompt_generator))
 
+    @timed("llm")
     def send_message(self, message: str) -> str:
-        try:
-            if not self.chat:
-                self.chat = self.model.start_chat()
+        with _upstream_errors("send message"):
+            self._ensure_chat()
+            self._fit_context()
+            tokens = self._record_context(message)
+            started = time.perf_counter()
             response = self.chat.send_message(message)
+            self._log_turn(started, tokens, response)
             return response.text.strip()
-        except GoogleAPIError as e:
-            raise RuntimeError(f"Google API error: {e}")
-        except Exception as e:
-            raise RuntimeError(f"Failed to send message: {e}")
+
+    def stream_message(self, message: str) -> Iterator[str]:
+        with _upstream_errors("stream message"):
+            self._ensure_chat()
+            with stage("llm"):
+                self._fit_context()
+                tokens = self._record_context(message)
+                response = self.chat.send_message(message, stream=True)
+            for chunk in timed_iter("llm", response):
+                if chunk.parts:
+                    yield chunk.text
+            self._log_streamed_turn(tokens, response)
 
     def continue_conversation(self, follow_up_message: str) -> str:
         return self.send_message(follow_up_message)
 
-    def reset_chat(self):
+
+class AsyncGeminiClient(_GeminiClientBase):
+    """Client for the Quart blueprint; every network call is awaited."""
+
+    async def _fit_context(self):
+        history, overflow = self._overflow()
+        if not overflow:
+            return
         try:
-            self.chat = self.model.start_chat()
+            prompt = self.context_policy.summary_prompt(self.summary, overflow)
+            text = (await self.model.generate_content_async(prompt)).text.strip()
         except Exception as e:
-            raise RuntimeError(f"Failed to reset chat: {e}")
+            logger.warning("Failed to summarize conversation: %s", e)
+            return
+        self._fold_into_summary(history, overflow, text)
 
-    def get_history(self):
-        return [
-            {"role": msg.role, "parts": [part.text for part in msg.parts]}
-            for msg in self.chat.history
-        ]
+    async def start_conversation(
+        self, user_input: str, prompt_generator: PromptGenerator = None
+    ) -> str:
+        with _upstream_errors("start conversation"):
+            return await self.send_message(
+                self._opening_prompt(user_input, prompt_generator)
+            )
+
+    @timed("llm")
+    async def send_message(self, message: str) -> str:
+        with _upstream_errors("send message"):
+            self._ensure_chat()
+            await self._fit_context()
+            tokens = self._record_context(message)
+            started = time.perf_counter()
+            response = await self.chat.send_message_async(message)
+            self._log_turn(started, tokens, response)
+            return response.text.strip()
+
+    async def stream_message(self, message: str) -> AsyncIterator[str]:
+        with _upstream_errors("stream message"):
+            self._ensure_chat()
+            with stage("llm"):
+                await self._fit_context()
+                tokens = self._record_context(message)
+                response = await self.chat.send_message_async(message, stream=True)
+            async for chunk in timed_aiter("llm", response):
+                if chunk.parts:
+                    yield chunk.text
+            self._log_streamed_turn(tokens, response)
+
+    async def continue_conversation(self, follow_up_message: str) -> str:
+        return await self.send_message(follow_up_message)
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+from google import generativeai as genai
+
+_lock = threading.Lock()
+_configured_key = None
+_models = {}
+
+
+def get_model(api_key: str, model_name: str) -> genai.GenerativeModel:
+    """
+    Returns the process-wide model for `model_name`.
+
+    genai.configure rebuilds the underlying API clients, so it only runs
+    when the key changes; every request after that shares the same
+    transport and its open connections.
+    """
+    global _configured_key
+    model = _models.get(model_name)
+    if model is not None and _configured_key == api_key:
+        return model
+
+    with _lock:
+        if _configured_key != api_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+        model = _models.get(model_name)
+        if model is None:
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+        return model
+
+
+class ChatCache:
+    """
+    Bounded LRU of live chat sessions keyed by user id.
+
+    A chat is checked out for the duration of a turn so two concurrent
+    requests for the same user never share one. It is only handed back
+    when the session id and stored history length it was checked in with
+    still match what the session store holds: a restarted conversation or
+    a turn served by another worker forces a rehydrate from Redis. The
+    stored length defaults to the chat's own and differs once older turns
+    are windowed out.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._chats = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def checkout(self, user_id: str, session_id: str | None, history_length: int):
+        with self._lock:
+            chat, cached_id, length = self._chats.pop(user_id, (None, None, None))
+        if (
+            chat is not None
+            and session_id is not None
+            and cached_id == session_id
+            and length == history_length
+        ):
+            self.hits += 1
+            return chat
+        self.misses += 1
+        return None
+
+    def checkin(self, user_id: str, chat, session_id: str, history_length: int = None):
+        if history_length is None:
+            history_length = len(chat.history)
+        with self._lock:
+            self._chats[user_id] = (chat, session_id, history_length)
+            self._chats.move_to_end(user_id)
+            while len(self._chats) > self.max_entries:
+                self._chats.popitem(last=False)
+
+    def discard(self, user_id: str):
+        with self._lock:
+            self._chats.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._chats.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._chats),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
@@ -1,47 +1,72 @@
-import json
-import os
+import logging
 import re
 from typing import List
 
-FOLDER_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
-FOLDER_SCRAPED = os.path.join(FOLDER_DATA, "scraped_courses")
-FOLDER_REQUIREMENTS = os.path.join(FOLDER_DATA, "requirements")
+from src.config import AppConfig
+from src.services.catalog_store import CatalogSnapshot, catalog_store
+from src.services.course_encoder import CourseEncoder, estimate_tokens
+from src.services.schedule_optimizer import (
+    Schedule,
+    ScheduleOptimizer,
+    build_section_options,
+)
+from src.services.timing import timed
+
+logger = logging.getLogger(__name__)
+
+# Program phrases recognized in student input and their default credit load.
+PROGRAM_BASE_CREDITS = {
+    "ll.m.": 9,
+    "llm": 9,
+    "master of laws": 9,
+    "ma hrsj": 12,
+    "human rights and social justice": 12,
+    "master of arts in human rights and social justice": 12,
+    "ma tefl": 12,
+    "tefl": 12,
+    "master of arts in teaching english as a foreign language": 12,
+    "mse": 9,
+    "master of science in economics": 9,
+    "mba": 11,
+    "master of business administration": 11,
+    "msm": 15,
+    "master of science in management": 15,
+    "me iesm": 15,
+    "ms iesm": 15,
+    "master of engineering in industrial engineering & systems management": 15,
+    "ms cis": 15,
+    "cis": 15,
+    "computer and information science": 15,
+    "mph": 18,
+    "public health": 18,
+    "master of public health": 18,
+    "maird": 12,
+    "international relations and diplomacy": 12,
+    "master of arts in international relations and diplomacy": 12,
+    "mpa": 12,
+    "master of public affairs": 12,
+}
 
 
 class PromptGenerator:
-    def __init__(self, user_input: str):
+    @timed("prompt")
+    def __init__(self, user_input: str, catalog: CatalogSnapshot = None):
         self.user_input = user_input
         prefs = self.extract_preferences(user_input)
         self.program_name = prefs["program_name"]
         self.completed_courses = prefs["completed_courses"]
         self.prefs = prefs
 
-        self.requirements = self._load_json(
-            os.path.join(FOLDER_SCRAPED, "aua_courses_all_faculties.json")
-        )
-        self.semester_courses = self._normalize_semester_courses(
-            os.path.join(FOLDER_SCRAPED, "aua_courses_by_semester.json"),
-            self.requirements,
-        )
-        self.degree_requirements = self._load_json(
-            os.path.join(FOLDER_REQUIREMENTS, "degree_requirements.json")
-        )
+        self.catalog = catalog or catalog_store.get()
+        self.requirements = self.catalog.catalog
+        self.semester_courses = self.catalog.semester_courses
+        self.degree_requirements = self.catalog.degree_requirements
         self.program_requirements = self.degree_requirements.get(self.program_name, {})
 
-        self.courses_by_faculty = self._load_json(
-            os.path.join(FOLDER_SCRAPED, "courses_by_faculty.json")
-        )
-        self.faculty_course_codes = {
-            c["code"].replace(" ", "")
-            for p, courses in self.courses_by_faculty.items()
-            if p.lower().replace(" ", "_") == self.program_name
-            for c in courses
-            if "code" in c
-        }
-
-    def _load_json(self, path: str):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        self.courses_by_faculty = self.catalog.courses_by_faculty
+        self.faculty_course_codes = self.catalog.index.faculty_codes(self.program_name)
+        self.prompt_stats = None
+        self._prompt = None
 
     def extract_preferences(self, user_input: str) -> dict:
         prefs = {
@@ -54,39 +79,7 @@ class PromptGenerator:
 
         input_lower = user_input.lower()
 
-        default_base = {
-            "ll.m.": 9,
-            "llm": 9,
-            "master of laws": 9,
-            "ma hrsj": 12,
-            "human rights and social justice": 12,
-            "master of arts in human rights and social justice": 12,
-            "ma tefl": 12,
-            "tefl": 12,
-            "master of arts in teaching english as a foreign language": 12,
-            "mse": 9,
-            "master of science in economics": 9,
-            "mba": 11,
-            "master of business administration": 11,
-            "msm": 15,
-            "master of science in management": 15,
-            "me iesm": 15,
-            "ms iesm": 15,
-            "master of engineering in industrial engineering & systems management": 15,
-            "ms cis": 15,
-            "cis": 15,
-            "computer and information science": 15,
-            "mph": 18,
-            "public health": 18,
-            "master of public health": 18,
-            "maird": 12,
-            "international relations and diplomacy": 12,
-            "master of arts in international relations and diplomacy": 12,
-            "mpa": 12,
-            "master of public affairs": 12,
-        }
-
-        for program, base_credits in default_base.items():
+        for program, base_credits in PROGRAM_BASE_CREDITS.items():
             if program in input_lower:
                 prefs["max_credits"] = base_credits
                 prefs["program_name"] = program.replace(" ", "_")
@@ -138,67 +131,119 @@ class PromptGenerator:
 
         return prefs
 
-    def _normalize_semester_courses(self, path: str, catalog: List[dict]) -> List[dict]:
-        raw_courses = self._load_json(path)
-        catalog_by_code = {c["code"]: c for c in catalog if "code" in c}
-        normalized_courses = []
-
-        for raw in raw_courses:
-            text = raw.get("Course", "").strip()
-            match = re.search(r"\(([A-Z]{2,4}\d{3})\)$", text)
-            code = match.group(1) if match else None
-            if not code:
-                continue
-            title = text.split("\n\n")[0]
-            cat = catalog_by_code.get(code, {})
-            normalized_courses.append(
-                {
-                    "code": code,
-                    "title": title,
-                    "description": cat.get("description", ""),
-                    "prerequisites": cat.get("prerequisites", ""),
-                    "credits": float(raw.get("Credits", 0)),
-                    "raw": raw,
-                }
-            )
-
-        return normalized_courses
-
     def _get_required_course_codes(self) -> List[str]:
-        entry = self.degree_requirements.get(self.program_name, {})
-        codes = re.findall(r"[A-Z]{2,4}\s?\d{3}", entry.get("raw_text", ""))
-        return [c.replace(" ", "") for c in codes]
-
-    def _prerequisites_met(self, course: dict) -> bool:
-        prereqs = re.findall(r"[A-Z]{2,4}\s?\d{3}", course.get("prerequisites", ""))
-        return all(p.replace(" ", "") in self.completed_courses for p in prereqs)
+        return sorted(self.catalog.index.required_codes(self.program_name))
 
     def filter_courses_by_prerequisites(self) -> List[dict]:
-        required = set(self._get_required_course_codes())
-        completed = set(self.completed_courses)
-        return [
-            c
-            for c in self.semester_courses
-            if self._prerequisites_met(c)
-            and c["code"] not in completed
-            and c["code"] in required
-            and (
-                not self.faculty_course_codes or c["code"] in self.faculty_course_codes
+        return self.catalog.index.eligible_courses(
+            self.program_name, self.completed_courses
+        )
+
+    @timed("prompt")
+    def build_schedules(
+        self, top_k: int = None, eligible_courses: List[dict] = None
+    ) -> List[Schedule]:
+        if eligible_courses is None:
+            eligible_courses = self.filter_courses_by_prerequisites()
+        options = build_section_options(
+            eligible_courses,
+            required_codes=self.catalog.index.required_codes(self.program_name),
+            unavailable_days=self.prefs["unavailable_days"],
+        )
+        optimizer = ScheduleOptimizer(max_nodes=AppConfig.SCHEDULE.MAX_SEARCH_NODES)
+        return optimizer.optimize(
+            options,
+            max_credits=self.prefs["max_credits"],
+            top_k=AppConfig.SCHEDULE.TOP_K if top_k is None else top_k,
+        )
+
+    @staticmethod
+    def _format_schedules(schedules: List[Schedule]) -> str:
+        lines = []
+        for number, schedule in enumerate(schedules, start=1):
+            courses = "; ".join(
+                f"{s.code} section {s.section} ({s.credits:g} cr, {s.times or 'TBD'})"
+                for s in schedule.sections
             )
-        ]
+            lines.append(
+                f"Option {number} ({schedule.total_credits:g} credits): {courses}"
+            )
+        return "\n".join(lines)
 
+    @timed("prompt")
     def build_prompt(self) -> str:
+        """
+        Builds the opening prompt once; later calls return the same text.
+
+        Only the parsed preferences go into it, never the student's own
+        words, so one generated plan serves every student with the same
+        profile (see plan_cache_key). Their words are sent with the first
+        follow-up instead (see first_follow_up).
+        """
+        if self._prompt is None:
+            self._prompt = self._build_prompt()
+        return self._prompt
+
+    def _build_prompt(self) -> str:
         prefs = self.prefs
 
         if not self.program_name:
             return (
                 "The student's program was not recognized from the input. "
-                "Please ask them to specify their degree program.\n\n"
-                f"Original user input: {self.user_input}"
+                "Please ask them to specify their degree program."
             )
 
         eligible_courses = self.filter_courses_by_prerequisites()
+        schedules = self.build_schedules(eligible_courses=eligible_courses)
+        scheduled_codes = {s.code for sch in schedules for s in sch.sections}
+        if schedules:
+            # The model only has to explain the locally solved candidates,
+            # so offerings outside them are left out of the prompt.
+            eligible_courses = [
+                c for c in eligible_courses if c["code"] in scheduled_codes
+            ]
+        schedules_text = (
+            self._format_schedules(schedules)
+            or "None found, build one from the offerings above"
+        )
 
+        encoder = CourseEncoder(
+            fmt=AppConfig.PROMPT.COURSE_FORMAT,
+            description_chars=AppConfig.PROMPT.DESCRIPTION_CHARS,
+        )
+        index = self.catalog.index
+        encoded = encoder.encode(
+            eligible_courses,
+            rank=lambda row: (
+                row["code"] not in scheduled_codes,
+                -len(index.unlocks(row["code"])),
+            ),
+            token_budget=max(
+                0,
+                AppConfig.PROMPT.TOKEN_BUDGET
+                - estimate_tokens(self._render_prompt("", schedules_text)),
+            ),
+        )
+
+        prompt = self._render_prompt(encoded.text or "None", schedules_text)
+        self.prompt_stats = {
+            "prompt_chars": len(prompt),
+            "prompt_tokens": estimate_tokens(prompt),
+            "courses_included": encoded.included,
+            "courses_dropped": encoded.dropped,
+        }
+        logger.info(
+            "Built prompt for %s: %d chars, ~%d tokens, %d courses included, %d dropped",
+            self.program_name,
+            self.prompt_stats["prompt_chars"],
+            self.prompt_stats["prompt_tokens"],
+            encoded.included,
+            encoded.dropped,
+        )
+        return prompt
+
+    def _render_prompt(self, courses_text: str, schedules_text: str) -> str:
+        prefs = self.prefs
         fallback_note = ""
         if not prefs["workload_explicitly_mentioned"]:
             fallback_note += (
@@ -218,16 +263,18 @@ class PromptGenerator:
                 
                 Based on the following:
                 - Degree requirements and course information: {prefs.get('raw_program_phrase', self.program_name.replace('_', ' ').title())}
-                - Current semester course offerings (filtered by prerequisites): {eligible_courses}
+                - Current semester course offerings (filtered by prerequisites):
+                {courses_text}
+                - Candidate schedules (conflict-free, within the credit limit and unavailable days):
+                {schedules_text}
                 - Student interests: {', '.join(prefs['interests']) or 'Not specified'}
                 - Preferred workload: {prefs['max_credits'] or 'Not specified'} credits
                 - Completed courses: {', '.join(self.completed_courses) or 'None'}
                 - Unavailable days: {', '.join(prefs['unavailable_days']) or 'None'}
                 
-                If any required field seems unclear, also use the original user input below for context:
-                "{self.user_input}"
+                The student's own message will follow with their first question; use it to refine the plan then.
                 
-                Generate an optimized course plan for this semester.
+                Generate an optimized course plan for this semester, preferring one of the candidate schedules.
                 List course codes, course names, number of credits, and give a short reason for each choice.
                 Ensure prerequisites are respected and the total credits do not exceed the student's preferred limit.
                         """.strip()
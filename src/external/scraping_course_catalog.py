@@ -1,9 +1,185 @@
+import codecs
 import requests
 import json
 import os
 import re
-from bs4 import BeautifulSoup
 from collections import defaultdict
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Iterable, Iterator
+
+from src.utils.files import write_json_atomic
+
+CODE_PATTERN = re.compile(r"^[A-Z]{2,4}\d{3}$")
+# BeautifulSoup's get_text leaves out the contents of these elements.
+NON_TEXT_TAGS = ("script", "style", "template")
+COURSE_FIELDS = ("faculty", "title", "description", "credits", "prerequisites")
+
+
+class ParagraphParser(HTMLParser):
+    """
+    Incremental parser that collects the text of every <p> element.
+
+    Matches BeautifulSoup's `p.get_text(strip=True)`: each text node inside
+    the paragraph is stripped and the pieces are joined without a
+    separator. Paragraphs become available in `paragraphs` as soon as their
+    closing tag has been fed, so the page never has to be held in memory.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        # Paragraphs still being read, in document order. Nested ones are
+        # released only after the enclosing paragraph, like find_all("p").
+        self._pending = []
+        self._open = []
+        self._text = []
+        self._hidden = 0
+
+    def _flush_text(self):
+        # A text node can arrive in several handle_data calls when it
+        # straddles two fed chunks.
+        if self._text and self._open and not self._hidden:
+            text = "".join(self._text).strip()
+            if text:
+                for slot in self._open:
+                    slot["parts"].append(text)
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag == "p":
+            slot = {"parts": [], "done": False}
+            self._pending.append(slot)
+            self._open.append(slot)
+        elif tag in NON_TEXT_TAGS:
+            self._hidden += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush_text()
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag == "p" and self._open:
+            self._open.pop()["done"] = True
+            self._release()
+        elif tag in NON_TEXT_TAGS and self._hidden:
+            self._hidden -= 1
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def handle_comment(self, data):
+        self._flush_text()
+
+    def _release(self):
+        while self._pending and self._pending[0]["done"]:
+            text = "".join(self._pending.pop(0)["parts"])
+            if text:
+                self.paragraphs.append(text)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        for slot in self._open:
+            slot["done"] = True
+        self._open = []
+        self._release()
+
+
+def iter_paragraphs(chunks: Iterable[str]) -> Iterator[str]:
+    parser = ParagraphParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.paragraphs
+        parser.paragraphs.clear()
+    parser.close()
+    yield from parser.paragraphs
+
+
+def parse_course_chunk(chunk: list, current_faculty: str) -> tuple[dict, str]:
+    """Builds a course record and returns it with the faculty now in effect."""
+    code = chunk[0]
+    title = ""
+    description = ""
+    credits = None
+    prerequisites = ""
+    faculty = current_faculty
+
+    for line in chunk[1:]:
+        if line.isupper() and not CODE_PATTERN.match(line):
+            faculty = line
+            continue
+        if not title:
+            title = line
+        elif "Credits:" in line:
+            try:
+                credits = float(line.split("Credits:")[1].strip())
+            except ValueError:
+                credits = None
+        elif "Prerequisite" in line:
+            if ":" in line:
+                prerequisites += line.split(":", 1)[1].strip() + " "
+            else:
+                prerequisites += line.strip() + " "
+        else:
+            description += line + " "
+
+    record = {
+        "faculty": faculty,
+        "code": code,
+        "title": title,
+        "description": description.strip(),
+        "credits": credits,
+        "prerequisites": prerequisites.strip(),
+    }
+    return record, faculty
+
+
+def iter_courses(paragraphs: Iterable[str]) -> Iterator[dict]:
+    """Groups paragraphs into courses, starting a new one at every course code."""
+    chunk = []
+    faculty = "Unknown"
+    for text in paragraphs:
+        if CODE_PATTERN.match(text) and chunk:
+            record, faculty = parse_course_chunk(chunk, faculty)
+            yield record
+            chunk = []
+        chunk.append(text)
+    if chunk:
+        yield parse_course_chunk(chunk, faculty)[0]
+
+
+@dataclass
+class CatalogDiff:
+    added: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    # code -> names of the fields that differ
+    changed: dict = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def to_dict(self) -> dict:
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+
+def diff_courses(previous: Iterable[dict], current: Iterable[dict]) -> CatalogDiff:
+    before = {course["code"]: course for course in previous}
+    after = {course["code"]: course for course in current}
+    diff = CatalogDiff(
+        added=[code for code in after if code not in before],
+        removed=[code for code in before if code not in after],
+    )
+    for code, course in after.items():
+        old = before.get(code)
+        if old is None:
+            continue
+        fields = [name for name in COURSE_FIELDS if old.get(name) != course.get(name)]
+        if fields:
+            diff.changed[code] = fields
+    return diff
 
 
 class CourseScraper:
@@ -16,74 +192,45 @@ class CourseScraper:
         self.grouped_output_file = os.path.join(
             base_dir, "..", "data", "scraped_courses", "courses_by_faculty.json"
         )
+        self.changes_output_file = os.path.join(
+            base_dir, "..", "data", "scraped_courses", "catalog_changes.json"
+        )
         self.courses = []
 
-    def scrape_courses(self):
-        response = requests.get(self.url)
-        if response.status_code != 200:
-            raise Exception(f"Failed to fetch page: {self.url}")
-
-        soup = BeautifulSoup(response.content, "html.parser")
-        paragraphs = [
-            p.get_text(strip=True) for p in soup.find_all("p") if p.get_text(strip=True)
-        ]
-
-        course_chunks = []
-        current_chunk = []
-        code_pattern = re.compile(r"^[A-Z]{2,4}\d{3}$")
-
-        for text in paragraphs:
-            if code_pattern.match(text):
-                if current_chunk:
-                    course_chunks.append(current_chunk)
-                current_chunk = [text]
-            else:
-                current_chunk.append(text)
-        if current_chunk:
-            course_chunks.append(current_chunk)
-
-        current_faculty = "Unknown"
-        for chunk in course_chunks:
-            code = chunk[0]
-            title = ""
-            description = ""
-            credits = None
-            prerequisites = ""
-            faculty = current_faculty
-
-            for line in chunk[1:]:
-                if line.isupper() and not code_pattern.match(line):
-                    faculty = line
-                    current_faculty = faculty
-                    continue
-                if not title:
-                    title = line
-                elif "Credits:" in line:
-                    try:
-                        credits = float(line.split("Credits:")[1].strip())
-                    except:
-                        credits = None
-                elif "Prerequisite" in line:
-                    if ":" in line:
-                        prerequisites += line.split(":", 1)[1].strip() + " "
-                    else:
-                        prerequisites += line.strip() + " "
-                else:
-                    description += line + " "
-
-            self.courses.append(
-                {
-                    "faculty": faculty,
-                    "code": code,
-                    "title": title,
-                    "description": description.strip(),
-                    "credits": credits,
-                    "prerequisites": prerequisites.strip(),
-                }
-            )
+    def _iter_page(self, chunk_size: int = 64 * 1024) -> Iterator[str]:
+        with requests.get(self.url, stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"Failed to fetch page: {self.url}")
+            declared = "charset" in response.headers.get("Content-Type", "").lower()
+            decoder = codecs.getincrementaldecoder(
+                response.encoding if declared else "utf-8"
+            )(errors="replace")
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+
+    def scrape_courses(self, chunks: Iterable[str] = None) -> CatalogDiff:
+        """
+        Parses the catalog page in one streaming pass and writes the flat
+        and per-faculty outputs plus the changes since the previous run.
 
+        `chunks` replaces the download, e.g. with a saved copy of the page.
+        """
+        previous = self._load(self.raw_output_file)
+
+        self.courses = []
+        grouped = defaultdict(list)
+        for course in iter_courses(
+            iter_paragraphs(chunks if chunks is not None else self._iter_page())
+        ):
+            self.courses.append(course)
+            grouped[course["faculty"]].append(course)
+
+        diff = diff_courses(previous, self.courses)
         self._save_to_file(self.raw_output_file, self.courses)
-        # print(f"Scraped {len(self.courses)} courses and saved to:\n{self.raw_output_file}")
+        self._save_to_file(self.grouped_output_file, grouped)
+        self._save_to_file(self.changes_output_file, diff.to_dict())
+        return diff
 
     def group_by_faculty(self):
         if not os.path.exists(self.raw_output_file):
@@ -100,7 +247,13 @@ class CourseScraper:
         self._save_to_file(self.grouped_output_file, grouped)
         # print(f"Grouped courses by faculty and saved to:\n{self.grouped_output_file}")
 
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
     def _save_to_file(self, path, data):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json_atomic(path, data)
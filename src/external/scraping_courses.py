@@ -1,17 +1,17 @@
 import os
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+
+from src.utils.files import write_json_atomic
+from .semester_offerings import (
+    OFFERINGS_URL,
+    TABLE_ID,
+    SemesterOfferingsFetcher,
+    parse_offerings,
+)
 
 
 class CourseScraper:
     def __init__(self):
-        self.url = "https://auasonis.jenzabarcloud.com/GENSRsC.cfm"
+        self.url = OFFERINGS_URL
 
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.save_dir = os.path.join(project_root, "data", "scraped_courses")
@@ -24,6 +24,28 @@ class CourseScraper:
                 f.write("[]")
 
     def run(self):
+        try:
+            data = SemesterOfferingsFetcher(self.url).fetch()
+        except Exception as e:
+            print(f"Plain HTTP fetch failed, falling back to a browser: {e}")
+            try:
+                data = self._scrape_with_browser()
+            except Exception as e:
+                print(f"Error during scraping: {e}")
+                return
+
+        write_json_atomic(self.filename, data)
+
+    def _scrape_with_browser(self):
+        # Selenium is only needed for this fallback; import it lazily.
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.chrome.service import Service
+        from webdriver_manager.chrome import ChromeDriverManager
+
         options = Options()
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
@@ -36,7 +58,7 @@ class CourseScraper:
         try:
             driver.get(self.url)
 
-            wait.until(EC.presence_of_element_located((By.ID, "crsbysemester")))
+            wait.until(EC.presence_of_element_located((By.ID, TABLE_ID)))
 
             # Change dropdown to "All"
             driver.execute_script(
@@ -56,36 +78,8 @@ class CourseScraper:
                 )
             )
 
-            table = driver.find_element(By.ID, "crsbysemester")
-            rows = table.find_element(By.TAG_NAME, "tbody").find_elements(
-                By.TAG_NAME, "tr"
-            )
-
-            data = []
-            for row in rows:
-                columns = row.find_elements(By.TAG_NAME, "td")
-                if len(columns) == 12:
-                    course_info = {
-                        "Course": columns[0].text.strip(),
-                        "Section": columns[1].text.strip(),
-                        "Session": columns[2].text.strip(),
-                        "Credits": columns[3].text.strip(),
-                        "Campus": columns[4].text.strip(),
-                        "Instructor": columns[5].text.strip(),
-                        "Times": columns[6].text.strip(),
-                        "Taken/Seats": columns[7].text.strip(),
-                        "Spaces Waiting": columns[8].text.strip(),
-                        "Delivery Method": columns[9].text.strip(),
-                        "Dist. Learning": columns[10].text.strip(),
-                        "Location": columns[11].text.strip(),
-                    }
-                    data.append(course_info)
-
-            # Save to JSON
-            df = pd.DataFrame(data)
-            df.to_json(self.filename, orient="records", indent=4, force_ascii=False)
-
-        except Exception as e:
-            print(f"Error during scraping: {e}")
+            # One round trip for the rendered table instead of one per cell.
+            table = driver.find_element(By.ID, TABLE_ID)
+            return parse_offerings([table.get_attribute("outerHTML")])
         finally:
             driver.quit()
@@ -0,0 +1,173 @@
+import re
+from html.parser import HTMLParser
+from typing import Iterable, List
+
+import requests
+
+from src.utils.times import parse_times
+
+OFFERINGS_URL = "https://auasonis.jenzabarcloud.com/GENSRsC.cfm"
+TABLE_ID = "crsbysemester"
+
+COLUMNS = (
+    "Course",
+    "Section",
+    "Session",
+    "Credits",
+    "Campus",
+    "Instructor",
+    "Times",
+    "Taken/Seats",
+    "Spaces Waiting",
+    "Delivery Method",
+    "Dist. Learning",
+    "Location",
+)
+
+BLOCK_TAGS = {"div", "p", "li", "ul", "ol", "table", "tr", "h1", "h2", "h3", "h4"}
+TAKEN_SEATS_PATTERN = re.compile(r"^\s*(\d+)\s*/\s*(\d+)\s*$")
+WHITESPACE = re.compile(r"[ \t\r\n\f]+")
+
+
+def _rendered_text(pieces: list) -> str:
+    """Joins cell text the way a browser renders it (WebElement.text)."""
+    lines = "".join(pieces).split("\n")
+    return "\n".join(line.strip(" ") for line in lines).strip()
+
+
+class OfferingsTableParser(HTMLParser):
+    """
+    Reads the rows of the semester offerings table from raw page HTML.
+
+    Cell text follows what Selenium's `.text` returned: whitespace runs
+    collapse to one space, <br> and block elements start new lines.
+    Rows that do not have one cell per column (group headers, "no data"
+    placeholders) are skipped.
+    """
+
+    def __init__(self, table_id: str = TABLE_ID):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.rows = []
+        self.found = False
+        self._table_depth = 0
+        self._in_body = False
+        self._row = None
+        self._cell = None
+
+    def _line_break(self, soft: bool):
+        if self._cell is None:
+            return
+        if soft and (not self._cell or self._cell[-1].endswith("\n")):
+            return
+        self._cell.append("\n")
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif dict(attrs).get("id") == self.table_id:
+                self.found = True
+                self._table_depth = 1
+            return
+        if self._table_depth != 1:
+            if tag == "br":
+                self._line_break(soft=False)
+            elif tag in BLOCK_TAGS:
+                self._line_break(soft=True)
+            return
+        if tag == "tbody":
+            self._in_body = True
+        elif tag == "tr" and self._in_body:
+            self._row = []
+        elif tag == "td" and self._row is not None:
+            self._cell = []
+        elif tag == "br":
+            self._line_break(soft=False)
+        elif tag in BLOCK_TAGS:
+            self._line_break(soft=True)
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == "br":
+            self._line_break(soft=False)
+
+    def handle_endtag(self, tag):
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            return
+        if self._table_depth != 1:
+            if tag in BLOCK_TAGS:
+                self._line_break(soft=True)
+            return
+        if tag == "td" and self._cell is not None:
+            self._row.append(_rendered_text(self._cell))
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if len(self._row) == len(COLUMNS):
+                self.rows.append(dict(zip(COLUMNS, self._row)))
+            self._row = None
+        elif tag == "tbody":
+            self._in_body = False
+        elif tag in BLOCK_TAGS:
+            self._line_break(soft=True)
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(WHITESPACE.sub(" ", data))
+
+
+def parse_taken_seats(text: str) -> tuple:
+    match = TAKEN_SEATS_PATTERN.match(text or "")
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def structure_offering(record: dict) -> dict:
+    """
+    Adds parsed fields next to the display columns.
+
+    `Meetings` holds one {"day", "start_minute", "end_minute"} entry per
+    weekly meeting (empty for "TBD"); `Taken` and `Seats` are integers or
+    None when the cell is not in "taken/seats" form.
+    """
+    taken, seats = parse_taken_seats(record.get("Taken/Seats"))
+    return {
+        **record,
+        "Meetings": [
+            {"day": day, "start_minute": start, "end_minute": end}
+            for day, start, end in parse_times(record.get("Times", ""))
+        ],
+        "Taken": taken,
+        "Seats": seats,
+    }
+
+
+def parse_offerings(chunks: Iterable[str], table_id: str = TABLE_ID) -> List[dict]:
+    parser = OfferingsTableParser(table_id)
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+    if not parser.found:
+        raise RuntimeError(f"Offerings table #{table_id} not found in page")
+    return [structure_offering(row) for row in parser.rows]
+
+
+class SemesterOfferingsFetcher:
+    """Fetches the offerings page over plain HTTP; no browser involved."""
+
+    def __init__(self, url: str = OFFERINGS_URL, timeout: float = 60):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> List[dict]:
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        offerings = parse_offerings([response.text])
+        if not offerings:
+            # The table is there but filled in by script; let the caller
+            # fall back to a browser.
+            raise RuntimeError("Offerings table has no rows")
+        return offerings
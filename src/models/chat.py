@@ -17,3 +17,4 @@ class Message(BaseModel):
 class ChatHistoryResponse(BaseModel):
     user_id: str
     history: list[Message]
+    total: int | None = None
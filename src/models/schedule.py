@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class ScheduledCourse(BaseModel):
+    code: str
+    title: str
+    section: str
+    credits: float
+    times: str
+
+
+class ScheduleCandidate(BaseModel):
+    courses: list[ScheduledCourse]
+    total_credits: float
+    required_covered: int
+
+
+class ScheduleResponse(BaseModel):
+    program: str
+    max_credits: float | None
+    schedules: list[ScheduleCandidate]
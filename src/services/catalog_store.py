@@ -0,0 +1,204 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import List, Mapping
+
+from src.services.course_index import CourseIndex
+
+FOLDER_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), "../data"))
+FOLDER_SCRAPED = os.path.join(FOLDER_DATA, "scraped_courses")
+FOLDER_REQUIREMENTS = os.path.join(FOLDER_DATA, "requirements")
+
+CATALOG_PATHS = {
+    "catalog": os.path.join(FOLDER_SCRAPED, "aua_courses_all_faculties.json"),
+    "semester": os.path.join(FOLDER_SCRAPED, "aua_courses_by_semester.json"),
+    "degree_requirements": os.path.join(
+        FOLDER_REQUIREMENTS, "degree_requirements.json"
+    ),
+    "courses_by_faculty": os.path.join(FOLDER_SCRAPED, "courses_by_faculty.json"),
+}
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """
+    Parsed catalog data shared by every request in the process.
+
+    Snapshots are never mutated after construction; a reload builds a new
+    snapshot and swaps the reference, so readers keep whatever they grabbed.
+    """
+
+    catalog: tuple
+    semester_courses: tuple
+    degree_requirements: Mapping
+    courses_by_faculty: Mapping
+    index: CourseIndex
+    file_stamps: tuple
+    version: str
+    loaded_at: float
+
+
+def _load_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _freeze(value):
+    """Read-only view of parsed JSON: dicts become mappings, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def normalize_semester_courses(
+    raw_courses: List[dict], catalog: List[dict]
+) -> List[dict]:
+    catalog_by_code = {c["code"]: c for c in catalog if "code" in c}
+    normalized_courses = []
+
+    for raw in raw_courses:
+        text = raw.get("Course", "").strip()
+        match = re.search(r"\(([A-Z]{2,4}\d{3})\)$", text)
+        code = match.group(1) if match else None
+        if not code:
+            continue
+        title = text.split("\n\n")[0]
+        cat = catalog_by_code.get(code, {})
+        normalized_courses.append(
+            {
+                "code": code,
+                "title": title,
+                "description": cat.get("description", ""),
+                "prerequisites": cat.get("prerequisites", ""),
+                "credits": float(raw.get("Credits", 0)),
+                "raw": raw,
+            }
+        )
+
+    return normalized_courses
+
+
+def _file_stamps(paths: dict) -> tuple:
+    stamps = []
+    for name in sorted(paths):
+        stat = os.stat(paths[name])
+        stamps.append((name, stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def load_snapshot(paths: dict = None) -> CatalogSnapshot:
+    paths = paths or CATALOG_PATHS
+    # Stamps are taken before reading so a write racing the load is picked
+    # up as a change on the next check instead of being missed.
+    stamps = _file_stamps(paths)
+
+    catalog = _load_json(paths["catalog"])
+    semester_courses = _freeze(
+        normalize_semester_courses(_load_json(paths["semester"]), catalog)
+    )
+    catalog = _freeze(catalog)
+    degree_requirements = _freeze(_load_json(paths["degree_requirements"]))
+    courses_by_faculty = _freeze(_load_json(paths["courses_by_faculty"]))
+
+    # The index is built from the frozen values so the offerings it hands
+    # out are the same read-only objects the snapshot holds.
+    return CatalogSnapshot(
+        catalog=catalog,
+        semester_courses=semester_courses,
+        degree_requirements=degree_requirements,
+        courses_by_faculty=courses_by_faculty,
+        index=CourseIndex(
+            catalog, semester_courses, degree_requirements, courses_by_faculty
+        ),
+        file_stamps=stamps,
+        version=hashlib.sha1(repr(stamps).encode("utf-8")).hexdigest()[:12],
+        loaded_at=time.time(),
+    )
+
+
+class CatalogStore:
+    """
+    Holds the current CatalogSnapshot for the worker process.
+
+    get() only stats the source files and returns the current reference;
+    the lock is taken solely when a reload is needed, so concurrent readers
+    never block each other. Files that failed to load are remembered by
+    their stamps and not retried until they change again.
+    """
+
+    def __init__(self, paths: dict = None):
+        self.paths = paths or CATALOG_PATHS
+        self._snapshot = None
+        self._failed_stamps = None
+        self._reload_lock = threading.Lock()
+        self.reload_count = 0
+        self.reload_errors = 0
+        self.last_reload_seconds = None
+
+    def get(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and not self._is_stale(snapshot):
+            return snapshot
+        return self._reload()
+
+    def _is_stale(self, snapshot: CatalogSnapshot) -> bool:
+        try:
+            stamps = _file_stamps(self.paths)
+        except OSError:
+            # A file being replaced mid-deploy; keep serving what we have.
+            return False
+        return stamps not in (snapshot.file_stamps, self._failed_stamps)
+
+    def _reload(self) -> CatalogSnapshot:
+        with self._reload_lock:
+            current = self._snapshot
+            if current is not None and not self._is_stale(current):
+                return current
+
+            start = time.perf_counter()
+            stamps = None
+            try:
+                stamps = _file_stamps(self.paths)
+                snapshot = load_snapshot(self.paths)
+            except (OSError, json.JSONDecodeError) as e:
+                self.reload_errors += 1
+                if current is None:
+                    raise RuntimeError(f"Failed to load course catalog: {e}")
+                self._failed_stamps = stamps
+                logger.warning(
+                    "Catalog reload failed, keeping version %s: %s", current.version, e
+                )
+                return current
+
+            self.last_reload_seconds = time.perf_counter() - start
+            self.reload_count += 1
+            self._snapshot = snapshot
+            logger.info(
+                "Loaded catalog version %s in %.3fs",
+                snapshot.version,
+                self.last_reload_seconds,
+            )
+            return snapshot
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "reload_count": self.reload_count,
+            "reload_errors": self.reload_errors,
+            "last_reload_seconds": self.last_reload_seconds,
+        }
+
+
+catalog_store = CatalogStore()
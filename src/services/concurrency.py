@@ -0,0 +1,76 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class UpstreamSaturated(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(f"Upstream is saturated, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class UpstreamLimiter:
+    """
+    Caps in-flight upstream calls for the async serving mode.
+
+    Callers beyond `max_concurrent` queue for at most `max_wait_seconds`;
+    once `max_queued` callers are already waiting, new ones are rejected
+    immediately so the server sheds load instead of piling up requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        max_wait_seconds: float,
+        retry_after: int,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait_seconds = max_wait_seconds
+        self.retry_after = retry_after
+        self._semaphore = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the serving event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def acquire(self):
+        if self.semaphore.locked() and self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise UpstreamSaturated(self.retry_after)
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise UpstreamSaturated(self.retry_after)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,125 @@
+import json
+from dataclasses import dataclass
+from typing import Callable, Iterable, List
+
+COURSE_FORMATS = ("table", "json")
+
+
+def estimate_tokens(text: str) -> int:
+    # Gemini averages roughly four characters per token on English text;
+    # close enough for budgeting without a round trip to count_tokens.
+    return (len(text) + 3) // 4
+
+
+def truncate(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    if limit <= 0:
+        return ""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut + "..."
+
+
+@dataclass(frozen=True)
+class EncodedCourses:
+    text: str
+    included: int
+    dropped: int
+    tokens: int
+
+
+class CourseEncoder:
+    """
+    Serializes eligible offerings for the prompt within a token budget.
+
+    Sections of the same course are merged into one row. When the rows do
+    not fit, courses are added in `rank` order until the budget is spent and
+    the rest are dropped.
+    """
+
+    def __init__(
+        self,
+        fmt: str = "table",
+        description_chars: int = 160,
+        token_budget: int = None,
+    ):
+        if fmt not in COURSE_FORMATS:
+            raise ValueError(
+                f"Unknown course format {fmt!r}, use one of {COURSE_FORMATS}"
+            )
+        self.fmt = fmt
+        self.description_chars = description_chars
+        self.token_budget = token_budget
+
+    def _group(self, offerings: Iterable[dict]) -> List[dict]:
+        grouped = {}
+        for offering in offerings:
+            raw = offering.get("raw", {})
+            row = grouped.setdefault(
+                offering["code"],
+                {
+                    "code": offering["code"],
+                    "title": " ".join(offering.get("title", "").split()),
+                    "credits": offering.get("credits"),
+                    "times": [],
+                    "prerequisites": offering.get("prerequisites", ""),
+                    "description": truncate(
+                        offering.get("description", ""), self.description_chars
+                    ),
+                },
+            )
+            times = raw.get("Times", "").strip().rstrip(",") or "TBD"
+            section = raw.get("Section")
+            row["times"].append(f"{section}: {times}" if section else times)
+        return list(grouped.values())
+
+    def _header(self) -> str:
+        if self.fmt == "table":
+            return "code | title | credits | times | prerequisites | description"
+        return ""
+
+    def _row(self, row: dict) -> str:
+        if self.fmt == "json":
+            return json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+        return " | ".join(
+            [
+                row["code"],
+                row["title"],
+                f"{row['credits']:g}" if row["credits"] is not None else "?",
+                " / ".join(row["times"]),
+                row["prerequisites"] or "-",
+                row["description"] or "-",
+            ]
+        )
+
+    def encode(
+        self,
+        offerings: Iterable[dict],
+        rank: Callable[[dict], tuple] = None,
+        token_budget: int = None,
+    ) -> EncodedCourses:
+        rows = self._group(offerings)
+        if rank is not None:
+            rows.sort(key=rank)
+        budget = self.token_budget if token_budget is None else token_budget
+
+        lines = [self._header()] if self._header() else []
+        used = sum(estimate_tokens(line) + 1 for line in lines)
+        included = 0
+        for row in rows:
+            line = self._row(row)
+            cost = estimate_tokens(line) + 1
+            if budget is not None and used + cost > budget:
+                break
+            lines.append(line)
+            used += cost
+            included += 1
+
+        text = "\n".join(lines) if included else ""
+        return EncodedCourses(
+            text=text,
+            included=included,
+            dropped=len(rows) - included,
+            tokens=estimate_tokens(text),
+        )
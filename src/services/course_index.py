@@ -0,0 +1,151 @@
+import re
+from collections import defaultdict
+from typing import Iterable, List
+
+COURSE_CODE_PATTERN = re.compile(r"[A-Z]{2,4}\s?\d{3}")
+AND_SEPARATOR = re.compile(r",|;|\band\b", re.IGNORECASE)
+
+
+def normalize_code(code: str) -> str:
+    return code.replace(" ", "").upper()
+
+
+def parse_prerequisites(text: str) -> tuple:
+    """
+    Parses catalog prerequisite text into AND-of-OR groups.
+
+    "BUS105, BUS109 or CS100" becomes (frozenset({"BUS105"}),
+    frozenset({"BUS109", "CS100"})): every group must contain at least one
+    completed course. Free-text conditions without course codes (credit
+    minimums, class standing) produce no groups.
+    """
+    groups = []
+    for part in AND_SEPARATOR.split(text or ""):
+        codes = frozenset(normalize_code(c) for c in COURSE_CODE_PATTERN.findall(part))
+        if codes and codes not in groups:
+            groups.append(codes)
+    return tuple(groups)
+
+
+class CourseIndex:
+    """
+    Precomputed lookups over one catalog snapshot.
+
+    Built once when the snapshot loads so that eligibility checks become
+    set operations instead of regex scans over every semester row.
+    """
+
+    def __init__(
+        self,
+        catalog: Iterable[dict],
+        semester_courses: Iterable[dict],
+        degree_requirements: dict,
+        courses_by_faculty: dict,
+    ):
+        self.offerings_by_code = defaultdict(list)
+        self._position = {}
+        for offering in semester_courses:
+            code = offering["code"]
+            self._position.setdefault(code, len(self._position))
+            self.offerings_by_code[code].append(offering)
+        self.offerings_by_code = {
+            code: tuple(offerings) for code, offerings in self.offerings_by_code.items()
+        }
+
+        self.prerequisites = {}
+        for course in catalog:
+            code = course.get("code")
+            if code and COURSE_CODE_PATTERN.fullmatch(code):
+                self.prerequisites[normalize_code(code)] = parse_prerequisites(
+                    course.get("prerequisites", "")
+                )
+        for code, offerings in self.offerings_by_code.items():
+            if code not in self.prerequisites:
+                self.prerequisites[code] = parse_prerequisites(
+                    offerings[0].get("prerequisites", "")
+                )
+
+        self.unlocks_direct = defaultdict(set)
+        for code, groups in self.prerequisites.items():
+            for group in groups:
+                for prerequisite in group:
+                    self.unlocks_direct[prerequisite].add(code)
+
+        self.required_by_program = {
+            program: frozenset(
+                normalize_code(c)
+                for c in COURSE_CODE_PATTERN.findall(entry.get("raw_text", ""))
+            )
+            for program, entry in degree_requirements.items()
+        }
+
+        self.faculty_codes_by_program = defaultdict(set)
+        for faculty, courses in courses_by_faculty.items():
+            key = faculty.lower().replace(" ", "_")
+            self.faculty_codes_by_program[key].update(
+                c["code"].replace(" ", "") for c in courses if "code" in c
+            )
+        self.faculty_codes_by_program = {
+            key: frozenset(codes)
+            for key, codes in self.faculty_codes_by_program.items()
+        }
+
+    def required_codes(self, program_name: str) -> frozenset:
+        return self.required_by_program.get(program_name, frozenset())
+
+    def faculty_codes(self, program_name: str) -> frozenset:
+        return self.faculty_codes_by_program.get(program_name, frozenset())
+
+    def prerequisites_met(self, code: str, completed: frozenset) -> bool:
+        return all(group & completed for group in self.prerequisites.get(code, ()))
+
+    def eligible_codes(self, program_name: str, completed: Iterable[str]) -> List[str]:
+        completed = frozenset(completed)
+        candidates = (
+            self.required_codes(program_name) & self.offerings_by_code.keys()
+        ) - completed
+        faculty_codes = self.faculty_codes(program_name)
+        if faculty_codes:
+            candidates &= faculty_codes
+        return sorted(
+            (c for c in candidates if self.prerequisites_met(c, completed)),
+            key=self._position.__getitem__,
+        )
+
+    def eligible_courses(
+        self, program_name: str, completed: Iterable[str]
+    ) -> List[dict]:
+        return [
+            offering
+            for code in self.eligible_codes(program_name, completed)
+            for offering in self.offerings_by_code[code]
+        ]
+
+    def unlocks(self, code: str) -> frozenset:
+        """Every course that lists `code` as a prerequisite, directly or transitively."""
+        seen = set()
+        stack = [normalize_code(code)]
+        while stack:
+            for dependent in self.unlocks_direct.get(stack.pop(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    stack.append(dependent)
+        return frozenset(seen)
+
+    def newly_unlocked(
+        self, completed: Iterable[str], taking: Iterable[str]
+    ) -> frozenset:
+        """Courses whose prerequisites become satisfied once `taking` is completed."""
+        completed = frozenset(completed)
+        after = completed | frozenset(taking)
+        candidates = {
+            dependent
+            for code in after - completed
+            for dependent in self.unlocks_direct.get(code, ())
+        }
+        return frozenset(
+            c
+            for c in candidates - after
+            if self.prerequisites_met(c, after)
+            and not self.prerequisites_met(c, completed)
+        )
@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import redis
+
+from src.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+def profile_cache_key(prefs: dict, catalog_version: str, model_name: str) -> str:
+    """
+    Key for a generated plan.
+
+    Only the parsed preferences shape the opening prompt (the student's
+    own words reach the model with their first follow-up), so students
+    whose inputs parse to the same profile share one plan.
+    """
+    profile = {
+        "program_name": prefs.get("program_name"),
+        "completed_courses": sorted(set(prefs.get("completed_courses", []))),
+        "max_credits": prefs.get("max_credits"),
+        "unavailable_days": sorted(set(prefs.get("unavailable_days", []))),
+        "interests": sorted(set(prefs.get("interests", []))),
+        "workload_explicitly_mentioned": prefs.get("workload_explicitly_mentioned"),
+        "catalog_version": catalog_version,
+        "model_name": model_name,
+    }
+    digest = hashlib.sha256(
+        json.dumps(profile, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return f"plan_cache:{digest}"
+
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry TTL, used when Redis is unreachable."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+class RedisCacheBackend:
+    # Redis expires keys on its own; evictions are not observable per client.
+    evictions = 0
+
+    def __init__(self, client: redis.Redis, ttl: int):
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, key: str) -> str | None:
+        return self.client.get(key)
+
+    def set(self, key: str, value: str):
+        self.client.set(key, value, ex=self.ttl)
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Caches generated plans and collapses concurrent identical requests.
+
+    The first caller for a key computes the value while later callers for
+    the same key wait on it instead of issuing their own upstream call.
+    Cache backend failures degrade to a miss and never fail the request.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._async_inflight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = self._connect()
+        return self._backend
+
+    @staticmethod
+    def _connect():
+        ttl = AppConfig.CACHE.TTL_SECONDS
+        client = redis.Redis(
+            host=AppConfig.REDIS.HOST,
+            port=AppConfig.REDIS.PORT,
+            db=AppConfig.REDIS.DB,
+            password=AppConfig.REDIS.PASSWORD,
+            decode_responses=True,
+            socket_connect_timeout=1,
+        )
+        try:
+            client.ping()
+            return RedisCacheBackend(client, ttl)
+        except redis.RedisError as e:
+            logger.warning(
+                "Redis unavailable for response cache, using local LRU: %s", e
+            )
+            return LocalCacheBackend(AppConfig.CACHE.MAX_ENTRIES, ttl)
+
+    def _get(self, key: str) -> str | None:
+        try:
+            return self.backend.get(key)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+    def _set(self, key: str, value: str):
+        try:
+            self.backend.set(key, value)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning("Response cache write failed: %s", e)
+
+    def get(self, key: str) -> str | None:
+        value = self._get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str):
+        self._set(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], str]) -> tuple[str, bool]:
+        """Returns (value, from_cache)."""
+        cached = self._get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached, True
+
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+
+        if not leader:
+            self.coalesced += 1
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+
+        try:
+            # A leader that finished between our miss and taking the
+            # flight has already stored the value.
+            cached = self._get(key)
+            if cached is not None:
+                self.hits += 1
+                flight.value = cached
+                return cached, True
+            self.misses += 1
+            flight.value = compute()
+            self._set(key, flight.value)
+            return flight.value, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            flight.done.set()
+
+    async def get_async(self, key: str) -> str | None:
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, value: str):
+        await asyncio.to_thread(self._set, key, value)
+
+    async def get_or_compute_async(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> tuple[str, bool]:
+        """Event-loop variant of get_or_compute; backend calls run in a thread."""
+        cached = await asyncio.to_thread(self._get, key)
+        if cached is not None:
+            self.hits += 1
+            return cached, True
+
+        flight = self._async_inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            value, _ = await asyncio.shield(flight)
+            return value, True
+
+        async def lead():
+            # Re-check inside the flight: the first lookup awaited, and a
+            # leader may have stored the value in the meantime.
+            cached = await asyncio.to_thread(self._get, key)
+            if cached is not None:
+                self.hits += 1
+                return cached, True
+            self.misses += 1
+            value = await compute()
+            await asyncio.to_thread(self._set, key, value)
+            return value, False
+
+        flight = self._async_inflight[key] = asyncio.ensure_future(lead())
+        try:
+            return await asyncio.shield(flight)
+        finally:
+            self._async_inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        backend = self._backend
+        return {
+            "backend": type(backend).__name__ if backend else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": backend.evictions if backend else 0,
+            "errors": self.errors,
+        }
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,177 @@
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from src.utils.times import parse_times
+
+
+def offering_meetings(raw: dict) -> tuple:
+    """Meetings of a semester row, preferring the ones parsed at ingest time."""
+    stored = raw.get("Meetings")
+    if stored is not None:
+        return tuple((m["day"], m["start_minute"], m["end_minute"]) for m in stored)
+    return parse_times(raw.get("Times", ""))
+
+
+@dataclass(frozen=True)
+class SectionOption:
+    code: str
+    title: str
+    section: str
+    credits: float
+    times: str
+    meetings: tuple
+    required: bool
+
+    def conflicts_with(self, other: "SectionOption") -> bool:
+        return any(
+            day == other_day and start < other_end and other_start < end
+            for day, start, end in self.meetings
+            for other_day, other_start, other_end in other.meetings
+        )
+
+
+@dataclass(frozen=True)
+class Schedule:
+    sections: tuple
+    total_credits: float
+    required_covered: int
+
+    @property
+    def score(self) -> tuple:
+        return (self.required_covered, len(self.sections), self.total_credits)
+
+    def to_dict(self) -> dict:
+        return {
+            "courses": [
+                {
+                    "code": s.code,
+                    "title": s.title,
+                    "section": s.section,
+                    "credits": s.credits,
+                    "times": s.times,
+                }
+                for s in self.sections
+            ],
+            "total_credits": self.total_credits,
+            "required_covered": self.required_covered,
+        }
+
+
+def build_section_options(
+    offerings: Iterable[dict],
+    required_codes: Iterable[str] = (),
+    unavailable_days: Iterable[str] = (),
+) -> List[SectionOption]:
+    required_codes = set(required_codes)
+    blocked = {day[:3].upper() for day in unavailable_days}
+    options = []
+    for offering in offerings:
+        raw = offering.get("raw", {})
+        times = raw.get("Times", "")
+        meetings = offering_meetings(raw)
+        if any(day in blocked for day, _, _ in meetings):
+            continue
+        options.append(
+            SectionOption(
+                code=offering["code"],
+                title=offering.get("title", ""),
+                section=raw.get("Section", ""),
+                credits=float(offering.get("credits") or 0),
+                times=times,
+                meetings=meetings,
+                required=offering["code"] in required_codes,
+            )
+        )
+    return options
+
+
+class ScheduleOptimizer:
+    """
+    Branch-and-bound search for conflict-free schedules.
+
+    Every course code is either skipped or taken in exactly one of its
+    sections. Schedules are ranked by required courses covered, then by
+    number of courses, then by total credits; the search stops expanding
+    once `max_nodes` partial schedules have been visited so that worst-case
+    latency stays bounded.
+    """
+
+    def __init__(self, max_nodes: int = 50000):
+        self.max_nodes = max_nodes
+
+    def optimize(
+        self,
+        options: Iterable[SectionOption],
+        max_credits: float = None,
+        top_k: int = 3,
+    ) -> List[Schedule]:
+        by_code = {}
+        for option in options:
+            if max_credits is None or option.credits <= max_credits:
+                by_code.setdefault(option.code, []).append(option)
+
+        groups = sorted(
+            by_code.values(),
+            key=lambda g: (not g[0].required, -g[0].credits, g[0].code),
+        )
+        remaining_required = [0] * (len(groups) + 1)
+        remaining_credits = [0.0] * (len(groups) + 1)
+        for i in range(len(groups) - 1, -1, -1):
+            remaining_required[i] = remaining_required[i + 1] + groups[i][0].required
+            remaining_credits[i] = remaining_credits[i + 1] + max(
+                o.credits for o in groups[i]
+            )
+
+        heap = []
+        counter = 0
+        nodes = 0
+        chosen = []
+
+        def bound(i, required, count, credits):
+            cap = remaining_credits[i] + credits
+            if max_credits is not None:
+                cap = min(cap, max_credits)
+            return (required + remaining_required[i], count + len(groups) - i, cap)
+
+        def search(i, required, credits):
+            nonlocal counter, nodes
+            nodes += 1
+            if nodes > self.max_nodes:
+                return
+            if (
+                len(heap) == top_k
+                and bound(i, required, len(chosen), credits) <= heap[0][0]
+            ):
+                return
+            if i == len(groups):
+                if chosen:
+                    schedule = Schedule(
+                        sections=tuple(chosen),
+                        total_credits=credits,
+                        required_covered=required,
+                    )
+                    counter += 1
+                    entry = (schedule.score, counter, schedule)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, entry)
+                    elif entry[0] > heap[0][0]:
+                        heapq.heapreplace(heap, entry)
+                return
+
+            for option in groups[i]:
+                if max_credits is not None and credits + option.credits > max_credits:
+                    continue
+                if any(option.conflicts_with(other) for other in chosen):
+                    continue
+                chosen.append(option)
+                search(i + 1, required + option.required, credits + option.credits)
+                chosen.pop()
+            search(i + 1, required, credits)
+
+        if top_k > 0:
+            search(0, 0, 0.0)
+        return [
+            entry[2]
+            for entry in sorted(heap, key=lambda e: (e[0], -e[1]), reverse=True)
+        ]
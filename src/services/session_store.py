@@ -1,11 +1,127 @@
 import redis
+import redis.asyncio as aioredis
 import json
+import uuid
 from src.config import AppConfig
+from src.services.timing import timed
 
+# Layout per user:
+#   chat:{user_id}:messages  list, one compact JSON message per entry, as
+#                            shown to the student
+#   chat:{user_id}:prompt    the planning prompt actually sent to Gemini in
+#                            place of the first user message
+#   chat:{user_id}:summary   JSON summary of older turns that are no longer
+#                            replayed verbatim, absent for short chats
+#   chat:{user_id}:session   random id written by every start_session, so
+#                            live chats cached by a worker can tell a
+#                            restarted conversation from the one they hold
+# Gemini history is the prompt followed by messages[1:], the first
+# follow-up carrying the opening message (see first_follow_up), so the
+# conversation is stored once. Sessions written before this layout live in
+# a single JSON blob under chat:{user_id} and are migrated on first read.
+
+
+def _messages_key(user_id: str) -> str:
+    return f"chat:{user_id}:messages"
+
+
+def _prompt_key(user_id: str) -> str:
+    return f"chat:{user_id}:prompt"
+
+
+def _summary_key(user_id: str) -> str:
+    return f"chat:{user_id}:summary"
+
+
+def _session_id_key(user_id: str) -> str:
+    return f"chat:{user_id}:session"
+
+
+def _legacy_key(user_id: str) -> str:
+    return f"chat:{user_id}"
+
+
+def _session_keys(user_id: str) -> tuple:
+    return (
+        _messages_key(user_id),
+        _prompt_key(user_id),
+        _summary_key(user_id),
+        _session_id_key(user_id),
+        _legacy_key(user_id),
+    )
+
+
+def encode_message(message: dict) -> str:
+    return json.dumps(
+        {"role": message["role"], "parts": message["parts"]},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+
+
+def decode_messages(entries: list) -> list:
+    return [json.loads(entry) for entry in entries]
+
+
+def first_follow_up(opening_input: str, message: str) -> str:
+    """
+    The student's first follow-up as sent to Gemini.
+
+    Opening prompts are built from the parsed preferences alone so their
+    plans can be shared through the response cache; the student's own
+    opening words reach the model here instead.
+    """
+    return (
+        f'My first message was: "{opening_input}"\n'
+        "Take into account anything in it the plan above does not cover.\n\n"
+        f"{message}"
+    )
+
+
+def to_gemini_history(prompt: str | None, messages: list) -> list:
+    if not messages:
+        return []
+    if not prompt:
+        return list(messages)
+    history = [{"role": "user", "parts": [prompt]}] + messages[1:]
+    if len(history) > 2:
+        opening_input = messages[0]["parts"][0]
+        history[2] = {
+            "role": "user",
+            "parts": [first_follow_up(opening_input, messages[2]["parts"][0])],
+        }
+    return history
+
+
+def _lrange_bounds(offset: int, limit: int | None) -> tuple[int, int]:
+    # LRANGE counts negative indexes from the end and treats 0..-1 as the
+    # whole list, so out-of-range pages must not reach it.
+    if offset < 0:
+        raise ValueError("offset must be >= 0")
+    if limit is not None and limit < 1:
+        raise ValueError("limit must be >= 1")
+    return offset, -1 if limit is None else offset + limit - 1
+
+
+def _parse_legacy(raw: str | None) -> tuple[str | None, list] | None:
+    try:
+        data = json.loads(raw) if raw else None
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not data.get("raw_history"):
+        return None
+    gemini_history = data.get("gemini_history") or []
+    prompt = gemini_history[0]["parts"][0] if gemini_history else None
+    return prompt, data["raw_history"]
+
+
+class _SessionStoreBase:
+    """Key layout and pipeline commands shared by the sync and async stores."""
+
+    redis_class = None
 
-class RedisSessionStore:
     def __init__(self):
-        self.client = redis.Redis(
+        self.client = self.redis_class(
             host=AppConfig.REDIS.HOST,
             port=AppConfig.REDIS.PORT,
             db=AppConfig.REDIS.DB,
@@ -14,32 +130,203 @@ class RedisSessionStore:
         )
         self.ttl = AppConfig.REDIS.TTL_SECONDS
 
-    def set_session(self, user_id: str, chat_state: dict):
+    def _write_session(self, pipe, user_id: str, prompt: str, messages: list) -> str:
+        session_id = uuid.uuid4().hex
+        pipe.delete(_messages_key(user_id), _summary_key(user_id), _legacy_key(user_id))
+        pipe.set(_prompt_key(user_id), prompt, ex=self.ttl)
+        pipe.set(_session_id_key(user_id), session_id, ex=self.ttl)
+        pipe.rpush(_messages_key(user_id), *map(encode_message, messages))
+        pipe.expire(_messages_key(user_id), self.ttl)
+        return session_id
+
+    def _append(self, pipe, user_id: str, messages: list, summary: dict | None):
+        pipe.rpush(_messages_key(user_id), *map(encode_message, messages))
+        if summary is not None:
+            pipe.set(_summary_key(user_id), json.dumps(summary), ex=self.ttl)
+        for key in (
+            _messages_key(user_id),
+            _prompt_key(user_id),
+            _summary_key(user_id),
+            _session_id_key(user_id),
+        ):
+            pipe.expire(key, self.ttl)
+
+
+class RedisSessionStore(_SessionStoreBase):
+    redis_class = redis.Redis
+
+    @timed("session")
+    def start_session(self, user_id: str, prompt: str, messages: list) -> str:
+        """Replaces the user's conversation and returns the new session id."""
         try:
-            self.client.set(f"chat:{user_id}", json.dumps(chat_state), ex=self.ttl)
+            pipe = self.client.pipeline(transaction=True)
+            session_id = self._write_session(pipe, user_id, prompt, messages)
+            pipe.execute()
+            return session_id
         except redis.RedisError as e:
             raise RuntimeError(f"Failed to set Redis session: {e}")
 
-    def get_session(self, user_id: str) -> dict | None:
+    @timed("session")
+    def append_messages(self, user_id: str, messages: list, summary: dict = None):
+        """Appends a turn, replacing the stored summary when one is given."""
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            self._append(pipe, user_id, messages, summary)
+            pipe.execute()
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to append to Redis session: {e}")
+
+    def _migrate_legacy(self, user_id: str) -> bool:
+        legacy = _parse_legacy(self.client.get(_legacy_key(user_id)))
+        if legacy is None:
+            return False
+        prompt, messages = legacy
+        self.start_session(user_id, prompt or messages[0]["parts"][0], messages)
+        return True
+
+    def history_length(self, user_id: str) -> int:
+        return self.session_state(user_id)[0]
+
+    @timed("session")
+    def session_state(self, user_id: str) -> tuple[int, dict | None, str | None]:
+        """Returns the stored history length, summary and session id."""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.llen(_messages_key(user_id))
+            pipe.get(_summary_key(user_id))
+            pipe.get(_session_id_key(user_id))
+            length, summary, session_id = pipe.execute()
+            if not length and self._migrate_legacy(user_id):
+                return self.session_state(user_id)
+            return length, json.loads(summary) if summary else None, session_id
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to get Redis session: {e}")
+
+    @timed("session")
+    def get_history(
+        self, user_id: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[list, int]:
+        """Returns one page of the displayed history and the total length."""
         try:
-            raw = self.client.get(f"chat:{user_id}")
-            if not raw:
+            start, end = _lrange_bounds(offset, limit)
+            pipe = self.client.pipeline(transaction=False)
+            pipe.lrange(_messages_key(user_id), start, end)
+            pipe.llen(_messages_key(user_id))
+            entries, total = pipe.execute()
+            if not total and self._migrate_legacy(user_id):
+                return self.get_history(user_id, offset, limit)
+            return decode_messages(entries), total
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to get Redis session: {e}")
+
+    @timed("session")
+    def get_gemini_history(self, user_id: str) -> list | None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(_prompt_key(user_id))
+            pipe.lrange(_messages_key(user_id), 0, -1)
+            prompt, entries = pipe.execute()
+            if not entries:
+                if self._migrate_legacy(user_id):
+                    return self.get_gemini_history(user_id)
                 return None
-            data = json.loads(raw)
-            return data if isinstance(data, dict) else None
+            return to_gemini_history(prompt, decode_messages(entries))
         except redis.RedisError as e:
             raise RuntimeError(f"Failed to get Redis session: {e}")
-        except json.JSONDecodeError:
-            return None
 
-    def get_raw_history(self, user_id: str) -> list | None:
-        session = self.get_session(user_id)
-        if session and "raw_history" in session:
-            return session["raw_history"]
-        return None
+    @timed("session")
+    def delete_session(self, user_id: str) -> bool:
+        try:
+            deleted = self.client.delete(*_session_keys(user_id))
+            return deleted > 0
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to delete Redis session: {e}")
+
+
+class AsyncRedisSessionStore(_SessionStoreBase):
+    """asyncio counterpart of RedisSessionStore for the ASGI serving mode."""
+
+    redis_class = aioredis.Redis
+
+    @timed("session")
+    async def start_session(self, user_id: str, prompt: str, messages: list) -> str:
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                session_id = self._write_session(pipe, user_id, prompt, messages)
+                await pipe.execute()
+            return session_id
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to set Redis session: {e}")
+
+    @timed("session")
+    async def append_messages(self, user_id: str, messages: list, summary: dict = None):
+        try:
+            async with self.client.pipeline(transaction=True) as pipe:
+                self._append(pipe, user_id, messages, summary)
+                await pipe.execute()
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to append to Redis session: {e}")
+
+    async def _migrate_legacy(self, user_id: str) -> bool:
+        legacy = _parse_legacy(await self.client.get(_legacy_key(user_id)))
+        if legacy is None:
+            return False
+        prompt, messages = legacy
+        await self.start_session(user_id, prompt or messages[0]["parts"][0], messages)
+        return True
+
+    async def history_length(self, user_id: str) -> int:
+        return (await self.session_state(user_id))[0]
+
+    @timed("session")
+    async def session_state(self, user_id: str) -> tuple[int, dict | None, str | None]:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.llen(_messages_key(user_id))
+                pipe.get(_summary_key(user_id))
+                pipe.get(_session_id_key(user_id))
+                length, summary, session_id = await pipe.execute()
+            if not length and await self._migrate_legacy(user_id):
+                return await self.session_state(user_id)
+            return length, json.loads(summary) if summary else None, session_id
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to get Redis session: {e}")
+
+    @timed("session")
+    async def get_history(
+        self, user_id: str, offset: int = 0, limit: int | None = None
+    ) -> tuple[list, int]:
+        try:
+            start, end = _lrange_bounds(offset, limit)
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.lrange(_messages_key(user_id), start, end)
+                pipe.llen(_messages_key(user_id))
+                entries, total = await pipe.execute()
+            if not total and await self._migrate_legacy(user_id):
+                return await self.get_history(user_id, offset, limit)
+            return decode_messages(entries), total
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to get Redis session: {e}")
+
+    @timed("session")
+    async def get_gemini_history(self, user_id: str) -> list | None:
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.get(_prompt_key(user_id))
+                pipe.lrange(_messages_key(user_id), 0, -1)
+                prompt, entries = await pipe.execute()
+            if not entries:
+                if await self._migrate_legacy(user_id):
+                    return await self.get_gemini_history(user_id)
+                return None
+            return to_gemini_history(prompt, decode_messages(entries))
+        except redis.RedisError as e:
+            raise RuntimeError(f"Failed to get Redis session: {e}")
 
-    def delete_session(self, user_id: str):
+    @timed("session")
+    async def delete_session(self, user_id: str) -> bool:
         try:
-            self.client.delete(f"chat:{user_id}")
+            deleted = await self.client.delete(*_session_keys(user_id))
+            return deleted > 0
         except redis.RedisError as e:
             raise RuntimeError(f"Failed to delete Redis session: {e}")
@@ -0,0 +1,141 @@
+import contextvars
+import functools
+import inspect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Wall time spent per stage (prompt, llm, session, ...) in one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = defaultdict(float)
+        self._active = set()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Value for the Server-Timing response header, in milliseconds."""
+        entries = [
+            f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()
+        ]
+        entries.append(f"total;dur={self.elapsed() * 1000:.1f}")
+        return ", ".join(entries)
+
+    def as_dict(self) -> dict:
+        """Stage and total durations in milliseconds."""
+        durations = {
+            name: round(seconds * 1000, 1) for name, seconds in self.stages.items()
+        }
+        durations["total"] = round(self.elapsed() * 1000, 1)
+        return durations
+
+
+def begin_request():
+    _current.set(RequestTimings())
+
+
+def current_timings() -> RequestTimings | None:
+    return _current.get()
+
+
+def add_server_timing(response):
+    """Sets the Server-Timing header and closes the request's timings."""
+    timings = _current.get()
+    if timings is not None:
+        response.headers["Server-Timing"] = timings.server_timing()
+        # Worker threads are reused; don't let later work land in this request.
+        _current.set(None)
+    return response
+
+
+@contextmanager
+def resume(timings: RequestTimings | None):
+    """
+    Makes `timings` current again inside a streamed response body.
+
+    The body runs after add_server_timing has closed the request, so stages
+    recorded there only reach the client through the stream itself.
+    """
+    if timings is None:
+        yield
+        return
+    previous = _current.get()
+    _current.set(timings)
+    try:
+        yield
+    finally:
+        _current.set(previous)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Adds the time spent in the block to the current request's `name` stage.
+
+    Outside a request this does nothing. A stage entered again while it is
+    already running (a timed method calling another) is only counted once.
+    """
+    timings = _current.get()
+    if timings is None or name in timings._active:
+        yield
+        return
+    timings._active.add(name)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[name] += time.perf_counter() - started
+        timings._active.discard(name)
+
+
+def timed(name: str):
+    """Decorator form of `stage` for plain and async functions."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def timed_iter(name: str, iterable):
+    """Yields from `iterable`, counting only the time spent waiting on it."""
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+async def timed_aiter(name: str, iterable):
+    """Async form of `timed_iter`."""
+    iterator = aiter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+        yield item
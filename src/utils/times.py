@@ -0,0 +1,31 @@
+import re
+
+MEETING_PATTERN = re.compile(
+    r"((?:MON|TUE|WED|THU|FRI|SAT|SUN)(?:/(?:MON|TUE|WED|THU|FRI|SAT|SUN))*)\s+"
+    r"(\d{1,2}):(\d{2})\s*([AP]M)\s*-\s*(\d{1,2}):(\d{2})\s*([AP]M)",
+    re.IGNORECASE,
+)
+
+
+def _to_minutes(hour: str, minute: str, meridiem: str) -> int:
+    hours = int(hour) % 12
+    if meridiem.lower() == "pm":
+        hours += 12
+    return hours * 60 + int(minute)
+
+
+def parse_times(text: str) -> tuple:
+    """
+    Parses a semester `Times` cell into (day, start_minute, end_minute) tuples.
+
+    Handles both "MON 10:30am-11:20am, WED 10:30am-11:20am" and
+    "TUE/THU 1:30 PM - 2:50 PM". "TBD" and unrecognized text yield no meetings.
+    """
+    meetings = []
+    for match in MEETING_PATTERN.finditer(text or ""):
+        days, h1, m1, ap1, h2, m2, ap2 = match.groups()
+        start = _to_minutes(h1, m1, ap1)
+        end = _to_minutes(h2, m2, ap2)
+        for day in days.upper().split("/"):
+            meetings.append((day, start, end))
+    return tuple(meetings)
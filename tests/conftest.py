@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from src import create_app
 
 @pytest.fixture
@@ -29,3 +30,32 @@ def mock_history():
         {"role": "user", "parts": ["Hi, I'm a student."]},
         {"role": "model", "parts": ["Hello! What program are you in?"]}
     ]
+
+
+@pytest.fixture(autouse=True)
+def local_response_cache():
+    from src.services.response_cache import LocalCacheBackend, ResponseCache
+
+    cache = ResponseCache(LocalCacheBackend(max_entries=16, ttl=60))
+    with patch("src.controllers.planner.response_cache", cache):
+        yield cache
+
+
+@pytest.fixture(autouse=True)
+def empty_chat_cache():
+    from src.external.gemini_client import chat_cache
+
+    chat_cache.clear()
+    yield chat_cache
+    chat_cache.clear()
+
+
+@pytest.fixture
+def redis_session_store():
+    import fakeredis
+    from src.services.session_store import RedisSessionStore
+
+    store = RedisSessionStore()
+    store.client = fakeredis.FakeRedis(decode_responses=True)
+    with patch("src.controllers.planner.session_store", store):
+        yield store
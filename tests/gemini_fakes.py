@@ -0,0 +1,59 @@
+"""
+Stand-ins for genai.GenerativeModel and its chats, shared by the tests.
+
+Messages are SimpleNamespace objects shaped like Gemini's Content (role
+plus parts with .text), which is all GeminiClient reads from them.
+"""
+
+import re
+import time
+from types import SimpleNamespace
+
+
+def content(message: dict):
+    return SimpleNamespace(
+        role=message["role"],
+        parts=[SimpleNamespace(text=text) for text in message["parts"]],
+    )
+
+
+class FakeChat:
+    def __init__(self, model, history):
+        self.model = model
+        self.history = [content(m) for m in history]
+        self.sent = []
+
+    def send_message(self, message, stream=False):
+        self.sent.append([m.parts[0].text for m in self.history] + [message])
+        self.history.append(content({"role": "user", "parts": [message]}))
+        self.history.append(content({"role": "model", "parts": [self.model.reply]}))
+        if stream:
+            return self.model.chunks()
+        return SimpleNamespace(text=self.model.reply, usage_metadata=None)
+
+    async def send_message_async(self, message):
+        return self.send_message(message)
+
+
+class FakeModel:
+    """Replies with `reply`; streamed replies arrive a word every `chunk_delay`."""
+
+    def __init__(self, reply: str = "ok", chunk_delay: float = 0):
+        self.reply = reply
+        self.chunk_delay = chunk_delay
+        self.summaries = []
+
+    def start_chat(self, history=None):
+        return FakeChat(self, history or [])
+
+    def chunks(self):
+        for text in re.findall(r"\S+\s*", self.reply):
+            time.sleep(self.chunk_delay)
+            yield SimpleNamespace(text=text, parts=[text])
+
+    def generate_content(self, prompt):
+        self.summaries.append(prompt)
+        return SimpleNamespace(text=f"notes v{len(self.summaries)}")
+
+    async def generate_content_async(self, prompt):
+        return self.generate_content(prompt)
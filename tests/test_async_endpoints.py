@@ -0,0 +1,226 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src import create_async_app
+from src.services.concurrency import UpstreamLimiter
+from src.services.response_cache import LocalCacheBackend, ResponseCache
+from src.services.session_store import to_gemini_history
+
+
+class FakeAsyncGeminiClient:
+    latency = 0.05
+    active = 0
+    peak = 0
+
+    summary_updated = False
+
+    def __init__(
+        self, api_key=None, model_name=None, history=None, chat=None, summary=None
+    ):
+        self.chat = chat or SimpleNamespace(history=list(history or []))
+        self.history = self.chat.history
+
+    async def _reply(self, message):
+        cls = type(self)
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            cls.active -= 1
+        self.history.append({"role": "user", "parts": [message]})
+        self.history.append({"role": "model", "parts": ["Async plan"]})
+        return "Async plan"
+
+    async def start_conversation(self, user_input, prompt_generator=None):
+        return await self._reply(user_input)
+
+    async def continue_conversation(self, message):
+        return await self._reply(message)
+
+    async def continue_conversation_stream(self, message):
+        yield await self._reply(message)
+
+    def get_history(self):
+        return self.history
+
+
+class InMemoryAsyncSessionStore:
+    def __init__(self):
+        self.sessions = {}
+
+    async def start_session(self, user_id, prompt, messages):
+        session_id = uuid.uuid4().hex
+        self.sessions[user_id] = {
+            "prompt": prompt,
+            "messages": list(messages),
+            "session_id": session_id,
+        }
+        return session_id
+
+    async def append_messages(self, user_id, messages, summary=None):
+        self.sessions[user_id]["messages"].extend(messages)
+
+    async def session_state(self, user_id):
+        session = self.sessions.get(user_id)
+        if not session:
+            return 0, None, None
+        return len(session["messages"]), None, session.get("session_id")
+
+    async def get_history(self, user_id, offset=0, limit=None):
+        messages = self.sessions.get(user_id, {}).get("messages", [])
+        end = None if limit is None else offset + limit
+        return messages[offset:end], len(messages)
+
+    async def get_gemini_history(self, user_id):
+        session = self.sessions.get(user_id)
+        if not session:
+            return None
+        return to_gemini_history(session["prompt"], session["messages"])
+
+    async def delete_session(self, user_id):
+        return self.sessions.pop(user_id, None) is not None
+
+
+@pytest.fixture
+def async_env():
+    FakeAsyncGeminiClient.active = FakeAsyncGeminiClient.peak = 0
+    store = InMemoryAsyncSessionStore()
+    limiter = UpstreamLimiter(
+        max_concurrent=100, max_queued=100, max_wait_seconds=1, retry_after=3
+    )
+    with patch(
+        "src.controllers.planner_async.AsyncGeminiClient", FakeAsyncGeminiClient
+    ), patch("src.controllers.planner_async.session_store", store), patch(
+        "src.controllers.planner_async.upstream_limiter", limiter
+    ), patch(
+        "src.controllers.planner_async.response_cache",
+        ResponseCache(LocalCacheBackend(max_entries=16, ttl=60)),
+    ):
+        yield store, limiter
+
+
+def test_async_chat_flow(async_env):
+    store, _ = async_env
+
+    async def scenario():
+        client = create_async_app().test_client()
+        start = await client.post(
+            "/api/start_chat",
+            json={"user_id": "u1", "user_input": "I'm a student in MS CIS"},
+        )
+        assert start.status_code == 200
+        assert (await start.get_json())["response"] == "Async plan"
+
+        follow_up = await client.post(
+            "/api/continue_chat", json={"user_id": "u1", "message": "And next?"}
+        )
+        assert follow_up.status_code == 200
+
+        history = await client.get("/api/chat_history?user_id=u1")
+        data = await history.get_json()
+        assert len(data["history"]) == 4 and data["total"] == 4
+
+        page = await client.get("/api/chat_history?user_id=u1&offset=2&limit=1")
+        assert (await page.get_json())["history"] == [data["history"][2]]
+
+        empty = await client.get("/api/chat_history?user_id=u1&limit=0")
+        assert empty.status_code == 400
+
+        reset = await client.post("/api/reset_chat", json={"user_id": "u1"})
+        assert reset.status_code == 200
+
+    asyncio.run(scenario())
+    assert store.sessions == {}
+
+
+def test_async_chats_run_concurrently(async_env):
+    async def scenario():
+        client = create_async_app().test_client()
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/api/start_chat",
+                    json={"user_id": f"u{i}", "user_input": f"Hello number {i}"},
+                )
+                for i in range(50)
+            )
+        )
+        assert all(r.status_code == 200 for r in responses)
+
+    asyncio.run(scenario())
+    assert FakeAsyncGeminiClient.peak > 1
+
+
+def test_saturated_upstream_returns_429(async_env):
+    _, limiter = async_env
+    limiter.max_concurrent = 1
+    limiter.max_queued = 0
+
+    async def scenario():
+        client = create_async_app().test_client()
+        await limiter.acquire()
+        try:
+            response = await client.post(
+                "/api/start_chat",
+                json={"user_id": "u1", "user_input": "Hello there"},
+            )
+        finally:
+            limiter.release()
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "3"
+
+    asyncio.run(scenario())
+    assert limiter.rejected == 1
+
+
+def test_stream_takes_its_slot_only_while_iterated(async_env):
+    store, limiter = async_env
+    store.sessions["u1"] = {
+        "prompt": "Plan",
+        "messages": [
+            {"role": "user", "parts": ["Hi"]},
+            {"role": "model", "parts": ["Hello"]},
+        ],
+    }
+    app = create_async_app()
+
+    async def scenario():
+        async with app.test_request_context(
+            "/api/continue_chat/stream",
+            method="POST",
+            json={"user_id": "u1", "message": "And next?"},
+        ):
+            await app.view_functions["planner_async.continue_chat_stream"]()
+        # Never iterated, e.g. the client went away before the body.
+        assert limiter.in_flight == 0
+
+        body = await app.test_client().post(
+            "/api/continue_chat/stream",
+            json={"user_id": "u1", "message": "And next?"},
+        )
+        assert "event: done" in (await body.get_data(as_text=True))
+        assert limiter.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_async_optimize_schedule_reports_catalog_errors_as_json():
+    failing = RuntimeError("Failed to load course catalog: gone")
+
+    async def scenario():
+        client = create_async_app().test_client()
+        with patch(
+            "src.controllers.planner_async.PromptGenerator", side_effect=failing
+        ):
+            response = await client.post(
+                "/api/optimize_schedule", json={"user_input": "I'm a student in MS CIS"}
+            )
+        assert response.status_code == 500
+        assert "course catalog" in (await response.get_json())["error"]
+
+    asyncio.run(scenario())
@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from src.services.catalog_store import CatalogStore
+
+
+def _write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+@pytest.fixture
+def catalog_paths(tmp_path):
+    paths = {
+        "catalog": str(tmp_path / "catalog.json"),
+        "semester": str(tmp_path / "semester.json"),
+        "degree_requirements": str(tmp_path / "degree_requirements.json"),
+        "courses_by_faculty": str(tmp_path / "courses_by_faculty.json"),
+    }
+    _write(
+        paths["catalog"],
+        [{"code": "CS120", "description": "Intro", "prerequisites": "CS100"}],
+    )
+    _write(
+        paths["semester"],
+        [
+            {"Course": "INTRO TO CS\n\n(CS120)", "Credits": "3"},
+            {"Course": "NO CODE HERE", "Credits": "3"},
+        ],
+    )
+    _write(paths["degree_requirements"], {"ms_cis": {"raw_text": "CS 120"}})
+    _write(paths["courses_by_faculty"], {"MSCIS": []})
+    return paths
+
+
+def test_get_returns_same_snapshot_until_files_change(catalog_paths):
+    store = CatalogStore(catalog_paths)
+
+    first = store.get()
+    assert store.get() is first
+    assert store.reload_count == 1
+    assert first.semester_courses[0]["code"] == "CS120"
+    assert first.semester_courses[0]["prerequisites"] == "CS100"
+    assert len(first.semester_courses) == 1
+
+    _write(catalog_paths["degree_requirements"], {"ms_cis": {"raw_text": "CS 121"}})
+    stat = os.stat(catalog_paths["degree_requirements"])
+    os.utime(
+        catalog_paths["degree_requirements"],
+        ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+    )
+
+    second = store.get()
+    assert second is not first
+    assert second.version != first.version
+    assert second.degree_requirements["ms_cis"]["raw_text"] == "CS 121"
+    assert store.reload_count == 2
+    assert store.stats()["last_reload_seconds"] is not None
+
+
+def test_failed_reload_keeps_previous_snapshot(catalog_paths):
+    store = CatalogStore(catalog_paths)
+    first = store.get()
+
+    with open(catalog_paths["catalog"], "w", encoding="utf-8") as f:
+        f.write("{not json")
+
+    assert store.get() is first
+    assert store.get() is first
+    assert store.reload_errors == 1
+
+    _write(catalog_paths["catalog"], [{"code": "CS121"}])
+    stat = os.stat(catalog_paths["catalog"])
+    os.utime(
+        catalog_paths["catalog"],
+        ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000),
+    )
+
+    assert store.get() is not first
+    assert store.reload_count == 2
+
+
+def test_snapshot_mappings_are_read_only(catalog_paths):
+    snapshot = CatalogStore(catalog_paths).get()
+
+    with pytest.raises(TypeError):
+        snapshot.degree_requirements["ms_cis"] = {}
+    with pytest.raises(TypeError):
+        snapshot.degree_requirements["ms_cis"]["raw_text"] = ""
+    assert snapshot.courses_by_faculty["MSCIS"] == ()
+
+
+def test_snapshot_courses_are_read_only_and_shared_with_the_index(catalog_paths):
+    snapshot = CatalogStore(catalog_paths).get()
+    offering = snapshot.semester_courses[0]
+
+    with pytest.raises(TypeError):
+        snapshot.catalog[0]["prerequisites"] = ""
+    with pytest.raises(TypeError):
+        offering["credits"] = 6
+    with pytest.raises(TypeError):
+        offering["raw"]["Credits"] = "6"
+    assert snapshot.index.offerings_by_code["CS120"][0] is offering
+
+
+def test_missing_catalog_raises(tmp_path):
+    store = CatalogStore({"catalog": str(tmp_path / "missing.json")})
+    with pytest.raises(RuntimeError):
+        store.get()
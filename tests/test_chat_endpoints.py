@@ -1,3 +1,4 @@
+import pytest
 from unittest.mock import patch
 
 @patch("src.controllers.planner.GeminiClient")
@@ -16,16 +17,15 @@ def test_start_chat_success(mock_store, mock_gemini, client, mock_start_response
 
     assert response.status_code == 200
     assert response.get_json()["response"] == mock_start_response
-    mock_store.set_session.assert_called_once()
+    mock_store.start_session.assert_called_once()
 
 
 @patch("src.controllers.planner.GeminiClient")
 @patch("src.controllers.planner.session_store")
 def test_continue_chat_success(mock_store, mock_gemini, client, mock_continue_response, mock_history):
-    mock_store.get_session.return_value = {
-        "gemini_history": mock_history,
-        "raw_history": mock_history.copy(),
-    }
+    mock_store.session_state.return_value = (len(mock_history), None, "s1")
+    mock_store.get_gemini_history.return_value = mock_history
+    mock_store.get_history.return_value = (mock_history[:1], len(mock_history))
     mock_client_instance = mock_gemini.return_value
     mock_client_instance.continue_conversation.return_value = mock_continue_response
     mock_client_instance.get_history.return_value = mock_history
@@ -39,12 +39,16 @@ def test_continue_chat_success(mock_store, mock_gemini, client, mock_continue_re
 
     assert response.status_code == 200
     assert response.get_json()["response"] == mock_continue_response
-    mock_store.set_session.assert_called_once()
+    sent = mock_client_instance.continue_conversation.call_args.args[0]
+    assert "Hi, I'm a student." in sent and sent.endswith("What courses can I take?")
+    user_id, messages, _ = mock_store.append_messages.call_args.args
+    assert messages[0]["parts"] == ["What courses can I take?"]
+    mock_store.get_session.assert_not_called()
 
 
 @patch("src.controllers.planner.session_store")
 def test_reset_chat_success(mock_store, client, mock_history):
-    mock_store.get_session.return_value = mock_history
+    mock_store.delete_session.return_value = True
 
     response = client.post("/api/reset_chat", json={"user_id": "test_user"})
 
@@ -62,7 +66,7 @@ def test_start_chat_missing_input(mock_store, client):
 
 @patch("src.controllers.planner.session_store")
 def test_get_chat_history_success(mock_store, client, mock_history):
-    mock_store.get_raw_history.return_value = mock_history
+    mock_store.get_history.return_value = (mock_history, len(mock_history))
     user_id = "test_user"
 
     response = client.get(f"/api/chat_history?user_id={user_id}")
@@ -71,7 +75,8 @@ def test_get_chat_history_success(mock_store, client, mock_history):
     data = response.get_json()
     assert data["user_id"] == user_id
     assert data["history"] == mock_history
-    mock_store.get_raw_history.assert_called_once_with(user_id)
+    assert data["total"] == len(mock_history)
+    mock_store.get_history.assert_called_once_with(user_id, offset=0, limit=None)
 
 
 @patch("src.controllers.planner.session_store")
@@ -82,11 +87,117 @@ def test_get_chat_history_missing_user_id(mock_store, client):
     assert "user_id is required" in response.get_json()["error"]
 
 
+@pytest.mark.parametrize("query", ["limit=0", "offset=-1", "limit=-3"])
+@patch("src.controllers.planner.session_store")
+def test_get_chat_history_rejects_bad_paging(mock_store, client, query):
+    response = client.get(f"/api/chat_history?user_id=test_user&{query}")
+
+    assert response.status_code == 400
+    mock_store.get_history.assert_not_called()
+
+
 @patch("src.controllers.planner.session_store")
 def test_get_chat_history_not_found(mock_store, client):
-    mock_store.get_raw_history.return_value = None
+    mock_store.get_history.return_value = ([], 0)
 
     response = client.get("/api/chat_history?user_id=unknown_user")
 
     assert response.status_code == 404
     assert "No chat history found" in response.get_json()["error"]
+
+
+def test_get_metrics_reports_catalog(client):
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert "reload_count" in response.get_json()["catalog"]
+
+
+@patch("src.controllers.planner.GeminiClient")
+def test_optimize_schedule_does_not_call_gemini(mock_gemini, client):
+    response = client.post(
+        "/api/optimize_schedule",
+        json={"user_input": "I'm a student in MS CIS", "top_k": 2},
+    )
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["program"] == "ms_cis"
+    assert len(data["schedules"]) <= 2
+    for schedule in data["schedules"]:
+        assert schedule["total_credits"] <= data["max_credits"]
+    mock_gemini.assert_not_called()
+
+
+@pytest.mark.parametrize("top_k", ["two", -1, 0, 1.5, True, [3]])
+def test_optimize_schedule_rejects_bad_top_k(client, top_k):
+    response = client.post(
+        "/api/optimize_schedule",
+        json={"user_input": "I'm a student in MS CIS", "top_k": top_k},
+    )
+
+    assert response.status_code == 400
+    assert "top_k" in response.get_json()["error"]
+
+
+@patch("src.controllers.planner.PromptGenerator")
+def test_optimize_schedule_caps_top_k(mock_generator, client):
+    mock_generator.return_value.build_schedules.return_value = []
+    mock_generator.return_value.prefs = {"max_credits": 15}
+    mock_generator.return_value.program_name = "ms_cis"
+
+    response = client.post(
+        "/api/optimize_schedule",
+        json={"user_input": "I'm a student in MS CIS", "top_k": "100000"},
+    )
+
+    assert response.status_code == 200
+    mock_generator.return_value.build_schedules.assert_called_once_with(10)
+
+
+def test_optimize_schedule_unknown_program(client):
+    response = client.post(
+        "/api/optimize_schedule", json={"user_input": "Hello there"}
+    )
+
+    assert response.status_code == 400
+
+
+@patch("src.controllers.planner.PromptGenerator")
+def test_optimize_schedule_reports_catalog_errors_as_json(mock_generator, client):
+    mock_generator.side_effect = RuntimeError("Failed to load course catalog: gone")
+
+    response = client.post(
+        "/api/optimize_schedule", json={"user_input": "I'm a student in MS CIS"}
+    )
+
+    assert response.status_code == 500
+    assert "course catalog" in response.get_json()["error"]
+
+
+@patch("src.controllers.planner.GeminiClient")
+@patch("src.controllers.planner.session_store")
+def test_start_chat_reuses_cached_plan(
+    mock_store, mock_gemini, client, mock_start_response, mock_history
+):
+    mock_client_instance = mock_gemini.return_value
+    mock_client_instance.start_conversation.return_value = mock_start_response
+    mock_client_instance.get_history.return_value = mock_history
+
+    openers = {
+        "first_user": "I'm a student in MS IESM",
+        "second_user": "Hello, I'm a student in ms iesm and want to work in energy",
+    }
+    for user_id, user_input in openers.items():
+        response = client.post(
+            "/api/start_chat", json={"user_id": user_id, "user_input": user_input}
+        )
+        assert response.status_code == 200
+        assert response.get_json()["response"] == mock_start_response
+
+    mock_client_instance.start_conversation.assert_called_once()
+    user_id, prompt, messages = mock_store.start_session.call_args_list[1].args
+    assert user_id == "second_user"
+    assert "Ms Iesm" in prompt and "energy" not in prompt
+    assert messages[0]["parts"] == [openers["second_user"]]
+    assert messages[1]["parts"] == [mock_start_response]
@@ -0,0 +1,128 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from gemini_fakes import FakeModel
+from src.external.context_window import (
+    SUMMARY_PREFIX,
+    ContextPolicy,
+    ConversationSummary,
+)
+from src.external.gemini_client import AsyncGeminiClient, GeminiClient
+
+
+def _turns(count, start=0):
+    history = []
+    for i in range(start, start + count):
+        history.append({"role": "user", "parts": [f"question {i}"]})
+        history.append({"role": "model", "parts": [f"answer {i}"]})
+    return history
+
+
+@pytest.fixture
+def model():
+    model = FakeModel()
+    with patch("src.external.gemini_client.get_model", return_value=model):
+        yield model
+
+
+def test_window_keeps_opening_summary_and_recent_turns():
+    policy = ContextPolicy(keep_turns=2, max_turns=4)
+    history = _turns(6)
+    summary = ConversationSummary(text="earlier notes", turns=2)
+
+    window = policy.window(history, summary)
+
+    assert window[:2] == history[:2]
+    assert window[2]["parts"] == [f"{SUMMARY_PREFIX} earlier notes"]
+    assert window[4:] == history[6:]
+    assert policy.overflow(window, summary) == []
+
+
+def test_overflow_folds_all_but_the_kept_turns():
+    policy = ContextPolicy(keep_turns=2, max_turns=3)
+    history = _turns(5)
+
+    assert policy.overflow(history, ConversationSummary()) == history[2:6]
+    assert policy.overflow(history[:8], ConversationSummary()) == []
+
+
+def test_policy_rejects_inconsistent_limits():
+    with pytest.raises(ValueError):
+        ContextPolicy(keep_turns=4, max_turns=2)
+
+
+def test_client_summarizes_only_when_window_overflows(model):
+    policy = ContextPolicy(keep_turns=2, max_turns=4)
+    client = GeminiClient("key", history=_turns(5), context_policy=policy)
+
+    client.send_message("next")
+    assert model.summaries == [] and not client.summary_updated
+
+    client.send_message("and then?")
+    assert len(model.summaries) == 1
+    assert client.summary == ConversationSummary(text="notes v1", turns=3)
+    assert client.summary_updated
+    sent = client.chat.sent[-1]
+    assert sent[:2] == ["question 0", "answer 0"]
+    assert sent[2] == f"{SUMMARY_PREFIX} notes v1"
+    assert sent[4:] == ["question 4", "answer 4", "next", "ok", "and then?"]
+    assert client.context_tokens > 0
+
+    client.send_message("more")
+    client.send_message("even more")
+    assert len(model.summaries) == 1
+
+
+def test_rehydrated_client_replays_only_the_window(model):
+    policy = ContextPolicy(keep_turns=2, max_turns=4)
+    client = GeminiClient(
+        "key",
+        history=_turns(6),
+        summary={"text": "notes v1", "turns": 3},
+        context_policy=policy,
+    )
+
+    texts = [m.parts[0].text for m in client.chat.history]
+    assert texts == [
+        "question 0",
+        "answer 0",
+        f"{SUMMARY_PREFIX} notes v1",
+        texts[3],
+        "question 4",
+        "answer 4",
+        "question 5",
+        "answer 5",
+    ]
+
+
+def test_failed_summary_keeps_full_window(model):
+    policy = ContextPolicy(keep_turns=1, max_turns=1)
+    client = GeminiClient("key", history=_turns(3), context_policy=policy)
+
+    with patch.object(model, "generate_content", side_effect=Exception("quota")):
+        assert client.send_message("next") == "ok"
+
+    assert not client.summary_updated
+    assert len(client.chat.sent[-1]) == 7
+
+
+def test_async_client_windows_like_the_sync_one(model):
+    policy = ContextPolicy(keep_turns=2, max_turns=4)
+    client = AsyncGeminiClient("key", history=_turns(5), context_policy=policy)
+
+    async def turns():
+        return [await client.send_message(m) for m in ("next", "and then?")]
+
+    assert asyncio.run(turns()) == ["ok", "ok"]
+    assert client.summary == ConversationSummary(text="notes v1", turns=3)
+    assert client.chat.sent[-1][2] == f"{SUMMARY_PREFIX} notes v1"
+
+
+def test_async_client_wraps_upstream_errors(model):
+    client = AsyncGeminiClient("key", history=_turns(1))
+
+    with patch.object(client.chat, "send_message", side_effect=Exception("quota")):
+        with pytest.raises(RuntimeError, match="Failed to send message: quota"):
+            asyncio.run(client.send_message("next"))
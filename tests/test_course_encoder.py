@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from src.config import _env_choice
+from src.services.course_encoder import (
+    COURSE_FORMATS,
+    CourseEncoder,
+    estimate_tokens,
+    truncate,
+)
+
+
+def _offering(code, section="0", description="A long description " * 20):
+    return {
+        "code": code,
+        "title": f"Course {code}",
+        "credits": 3.0,
+        "prerequisites": "",
+        "description": description,
+        "raw": {"Times": "MON 9:30am-10:20am, ", "Section": section},
+    }
+
+
+def test_truncate_cuts_on_word_boundary():
+    assert truncate("one two three", 100) == "one two three"
+    assert truncate("one two three", 9) == "one two..."
+    assert truncate("anything", 0) == ""
+
+
+def test_table_merges_sections_into_one_row():
+    encoded = CourseEncoder(description_chars=20).encode(
+        [_offering("CS120", "A"), _offering("CS120", "B"), _offering("CS130")]
+    )
+
+    lines = encoded.text.splitlines()
+    assert lines[0].startswith("code | title")
+    assert len(lines) == 3
+    assert "A: MON 9:30am-10:20am / B: MON 9:30am-10:20am" in lines[1]
+    assert encoded.included == 2
+    assert encoded.dropped == 0
+
+
+def test_json_format_is_one_object_per_line():
+    encoded = CourseEncoder(fmt="json").encode([_offering("CS120")])
+
+    assert json.loads(encoded.text)["code"] == "CS120"
+
+
+def test_budget_keeps_highest_ranked_courses():
+    offerings = [_offering(f"CS1{i}0") for i in range(5)]
+    encoder = CourseEncoder(description_chars=40)
+    full = encoder.encode(offerings)
+
+    trimmed = encoder.encode(
+        offerings,
+        rank=lambda row: row["code"] != "CS140",
+        token_budget=full.tokens // 2,
+    )
+
+    assert trimmed.tokens <= full.tokens // 2
+    assert trimmed.included + trimmed.dropped == 5
+    assert trimmed.dropped > 0
+    assert trimmed.text.splitlines()[1].startswith("CS140")
+    assert estimate_tokens(trimmed.text) == trimmed.tokens
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        CourseEncoder(fmt="xml")
+
+
+def test_invalid_course_format_setting_falls_back_to_default(monkeypatch, caplog):
+    monkeypatch.setenv("PROMPT_COURSE_FORMAT", "yaml")
+
+    assert _env_choice("PROMPT_COURSE_FORMAT", "table", COURSE_FORMATS) == "table"
+    assert "PROMPT_COURSE_FORMAT" in caplog.text
+
+    monkeypatch.setenv("PROMPT_COURSE_FORMAT", " JSON ")
+    assert _env_choice("PROMPT_COURSE_FORMAT", "table", COURSE_FORMATS) == "json"
@@ -0,0 +1,64 @@
+import pytest
+
+from src.services.course_index import CourseIndex, parse_prerequisites
+
+
+@pytest.fixture
+def index():
+    catalog = [
+        {"code": "CS100", "prerequisites": ""},
+        {"code": "CS120", "prerequisites": "CS100"},
+        {"code": "CS121", "prerequisites": "CS120"},
+        {"code": "CS130", "prerequisites": "CS109 or CS100, CS120"},
+        {"code": "CS140", "prerequisites": "At least 60 completed credits required."},
+    ]
+    semester_courses = [
+        {"code": code, "prerequisites": c["prerequisites"], "credits": 3.0}
+        for code, c in (
+            ("CS121", catalog[2]),
+            ("CS120", catalog[1]),
+            ("CS130", catalog[3]),
+            ("CS140", catalog[4]),
+            ("CS120", catalog[1]),
+        )
+    ]
+    degree_requirements = {
+        "ms_cis": {"raw_text": "CS 120 CS 121 CS 130 CS 140"},
+        "mscis": {"raw_text": "CS 120 CS 140"},
+    }
+    courses_by_faculty = {"MSCIS": [{"code": "CS 120"}]}
+    return CourseIndex(
+        catalog, semester_courses, degree_requirements, courses_by_faculty
+    )
+
+
+def test_parse_prerequisites_groups_alternatives():
+    assert parse_prerequisites("BUS105, BUS109 or CS 100") == (
+        frozenset({"BUS105"}),
+        frozenset({"BUS109", "CS100"}),
+    )
+    assert parse_prerequisites("A minimum of 80 completed credits is required.") == ()
+
+
+def test_eligible_courses_uses_or_groups(index):
+    assert index.eligible_codes("ms_cis", ["CS100"]) == ["CS120", "CS140"]
+    assert index.eligible_codes("ms_cis", ["CS109", "CS120"]) == [
+        "CS121",
+        "CS130",
+        "CS140",
+    ]
+    assert [c["code"] for c in index.eligible_courses("ms_cis", ["CS100"])] == [
+        "CS120",
+        "CS120",
+        "CS140",
+    ]
+
+
+def test_faculty_codes_restrict_eligibility(index):
+    assert index.eligible_codes("mscis", ["CS100"]) == ["CS120"]
+    assert index.faculty_codes("mscis") == frozenset({"CS120"})
+
+
+def test_unlocks_is_transitive(index):
+    assert index.unlocks("CS 100") == frozenset({"CS120", "CS121", "CS130"})
+    assert index.newly_unlocked(["CS100"], ["CS120"]) == frozenset({"CS121", "CS130"})
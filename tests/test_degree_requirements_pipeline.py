@@ -0,0 +1,157 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.external.degree_requirements_pipeline import (
+    RequirementSource,
+    RequirementsIngestor,
+    load_sources,
+    main,
+)
+
+
+def _page(*paragraphs):
+    return "".join(f"<p>{p}</p>" for p in paragraphs).encode("utf-8")
+
+
+@pytest.fixture
+def pages(tmp_path):
+    (tmp_path / "cis.html").write_bytes(_page("CS 100 Intro", "CS 120 Data"))
+    (tmp_path / "iesm.html").write_bytes(_page("IESM 210 Operations"))
+    return tmp_path
+
+
+def _sources(pages):
+    return [
+        RequirementSource("ms_cis", str(pages / "cis.html"), "webpage"),
+        RequirementSource(
+            "ms_iesm", (pages / "iesm.html").as_uri(), "webpage", "MS IESM"
+        ),
+    ]
+
+
+def _read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_ingests_sources_and_writes_output_once(pages):
+    output = pages / "out" / "degree_requirements.json"
+    ingestor = RequirementsIngestor(str(output), extract_workers=0)
+
+    report = ingestor.run(_sources(pages))
+
+    assert sorted(report.extracted) == ["ms_cis", "ms_iesm"]
+    assert _read(output) == {
+        "ms_cis": {"program": "Ms Cis", "raw_text": "CS 100 Intro\nCS 120 Data"},
+        "ms_iesm": {"program": "MS IESM", "raw_text": "IESM 210 Operations"},
+    }
+    manifest = _read(pages / "out" / "degree_requirements.manifest.json")
+    assert set(manifest) == {"ms_cis", "ms_iesm"}
+    assert [p.name for p in output.parent.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_unchanged_sources_are_skipped(pages):
+    output = pages / "degree_requirements.json"
+    ingestor = RequirementsIngestor(str(output), extract_workers=0)
+    ingestor.run(_sources(pages))
+    (pages / "iesm.html").write_bytes(_page("IESM 310 Quality"))
+
+    report = ingestor.run(_sources(pages))
+
+    assert report.extracted == ["ms_iesm"]
+    assert report.unchanged == ["ms_cis"]
+    assert _read(output)["ms_iesm"]["raw_text"] == "IESM 310 Quality"
+    assert ingestor.run(_sources(pages), force=True).unchanged == []
+
+
+def test_failed_source_keeps_previous_entry(pages):
+    output = pages / "degree_requirements.json"
+    output.write_text(
+        json.dumps({"ms_cis": {"program": "Ms Cis", "raw_text": "old"}, "other": {}}),
+        encoding="utf-8",
+    )
+    sources = [RequirementSource("ms_cis", str(pages / "missing.html"), "webpage")]
+
+    report = RequirementsIngestor(str(output), extract_workers=0).run(sources)
+
+    assert list(report.failed) == ["ms_cis"]
+    assert _read(output)["ms_cis"]["raw_text"] == "old"
+    assert "other" in _read(output)
+
+
+class _EtagHandler(BaseHTTPRequestHandler):
+    body = _page("BUS 105 Accounting")
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(self.headers.get("If-None-Match"))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EtagHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_sources_use_etags_and_process_pool(tmp_path, http_server):
+    _EtagHandler.requests = []
+    output = tmp_path / "degree_requirements.json"
+    ingestor = RequirementsIngestor(str(output), extract_workers=1)
+    sources = [RequirementSource("ba_business", f"{http_server}/ba", "webpage")]
+
+    first = ingestor.run(sources)
+    second = ingestor.run(sources)
+
+    assert first.extracted == ["ba_business"]
+    assert second.unchanged == ["ba_business"]
+    assert _EtagHandler.requests == [None, '"v1"']
+    assert _read(output)["ba_business"]["raw_text"] == "BUS 105 Accounting"
+
+
+def test_cli_reads_sources_file(pages, capsys):
+    (pages / "sources.json").write_text(
+        json.dumps({"ms_cis": {"url": str(pages / "cis.html"), "kind": "webpage"}}),
+        encoding="utf-8",
+    )
+    output = pages / "degree_requirements.json"
+
+    exit_code = main(
+        [
+            "--sources",
+            str(pages / "sources.json"),
+            "--output",
+            str(output),
+            "--extract-workers",
+            "0",
+        ]
+    )
+
+    assert exit_code == 0
+    assert "1 extracted" in capsys.readouterr().out
+    assert "ms_cis" in _read(output)
+
+
+def test_unknown_source_kind_is_rejected(tmp_path):
+    path = tmp_path / "sources.json"
+    path.write_text(json.dumps({"x": {"url": "x.doc", "kind": "doc"}}))
+
+    with pytest.raises(ValueError):
+        load_sources(str(path))
@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.external import gemini_pool
+from src.external.gemini_pool import ChatCache, get_model
+
+
+@patch.object(gemini_pool, "_models", {})
+@patch.object(gemini_pool, "_configured_key", None)
+@patch("src.external.gemini_pool.genai")
+def test_get_model_configures_once_per_key(mock_genai):
+    first = get_model("key-1", "gemini-2.0-flash")
+    second = get_model("key-1", "gemini-2.0-flash")
+
+    assert first is second
+    mock_genai.configure.assert_called_once_with(api_key="key-1")
+    mock_genai.GenerativeModel.assert_called_once_with("gemini-2.0-flash")
+
+    get_model("key-2", "gemini-2.0-flash")
+    assert mock_genai.configure.call_count == 2
+
+
+def test_chat_cache_checks_history_length():
+    cache = ChatCache(max_entries=2)
+    chat = SimpleNamespace(history=[1, 2])
+    cache.checkin("u1", chat, "s1")
+
+    assert cache.checkout("u1", "s1", 4) is None
+    cache.checkin("u1", chat, "s1")
+    assert cache.checkout("u1", "s1", 2) is chat
+    assert cache.checkout("u1", "s1", 2) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_chat_cache_misses_chats_from_a_replaced_session():
+    cache = ChatCache(max_entries=2)
+    chat = SimpleNamespace(history=[1, 2])
+    cache.checkin("u1", chat, "s1")
+
+    assert cache.checkout("u1", "s2", 2) is None
+    cache.checkin("u1", chat, "s1")
+    assert cache.checkout("u1", None, 2) is None
+
+
+def test_chat_cache_is_bounded():
+    cache = ChatCache(max_entries=2)
+    for user_id in ("u1", "u2", "u3"):
+        cache.checkin(user_id, SimpleNamespace(history=[]), "s1")
+
+    assert cache.checkout("u1", "s1", 0) is None
+    assert cache.stats()["size"] == 2
+
+
+def test_chat_cache_validates_windowed_chats_against_stored_length():
+    cache = ChatCache(max_entries=2)
+    chat = SimpleNamespace(history=[1, 2, 3, 4])
+    cache.checkin("u1", chat, "s1", history_length=10)
+
+    assert cache.checkout("u1", "s1", 4) is None
+    cache.checkin("u1", chat, "s1", history_length=10)
+    assert cache.checkout("u1", "s1", 10) is chat
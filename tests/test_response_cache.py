@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from src.external.prompt_generator import PromptGenerator
+from src.services.response_cache import (
+    LocalCacheBackend,
+    ResponseCache,
+    profile_cache_key,
+)
+
+
+def test_profile_cache_key_ignores_ordering():
+    prefs = {
+        "program_name": "ms_cis",
+        "completed_courses": ["CS120", "CS100"],
+        "unavailable_days": ["Friday", "Monday"],
+        "max_credits": 15,
+    }
+    reordered = dict(
+        prefs,
+        completed_courses=["CS100", "CS120", "CS100"],
+        unavailable_days=["Monday", "Friday"],
+    )
+
+    key = profile_cache_key(prefs, "v1", "gemini")
+    assert key == profile_cache_key(reordered, "v1", "gemini")
+    assert key != profile_cache_key(prefs, "v2", "gemini")
+
+
+def test_differently_worded_inputs_share_a_plan():
+    first = PromptGenerator("I'm a student in MS CIS. No classes on friday.")
+    second = PromptGenerator(
+        "hi! i'm a student in ms cis and want to get into security. "
+        "No classes on friday please"
+    )
+
+    assert profile_cache_key(first.prefs, "v1", "g") == profile_cache_key(
+        second.prefs, "v1", "g"
+    )
+    assert first.build_prompt() == second.build_prompt()
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalCacheBackend(max_entries=2, ttl=60)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == "1"
+    assert backend.evictions == 1
+
+
+def test_local_backend_expires_entries():
+    backend = LocalCacheBackend(max_entries=2, ttl=0)
+    backend.set("a", "1")
+
+    assert backend.get("a") is None
+    assert backend.evictions == 1
+
+
+def test_get_or_compute_counts_hits_and_misses():
+    cache = ResponseCache(LocalCacheBackend(max_entries=4, ttl=60))
+
+    assert cache.get_or_compute("k", lambda: "plan") == ("plan", False)
+    assert cache.get_or_compute("k", lambda: "other") == ("plan", True)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_concurrent_identical_requests_share_one_call():
+    cache = ResponseCache(LocalCacheBackend(max_entries=4, ttl=60))
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "plan"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("k", compute))
+        )
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    while not cache._inflight:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["plan"] * 5
+
+
+def test_leader_rechecks_the_cache():
+    backend = LocalCacheBackend(max_entries=4, ttl=60)
+    cache = ResponseCache(backend)
+    lookups = []
+
+    def get(key):
+        # The first lookup misses; a parallel leader stores the plan
+        # before this caller takes the flight.
+        lookups.append(key)
+        if len(lookups) == 1:
+            return None
+        return "stored"
+
+    backend.get = get
+    computed = []
+
+    assert cache.get_or_compute("k", lambda: computed.append(1) or "plan") == (
+        "stored",
+        True,
+    )
+    assert computed == []
+
+
+def test_failed_compute_is_not_cached():
+    cache = ResponseCache(LocalCacheBackend(max_entries=4, ttl=60))
+
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fail)
+    assert cache.get_or_compute("k", lambda: "plan") == ("plan", False)
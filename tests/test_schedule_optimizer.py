@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from src.external.prompt_generator import PromptGenerator
+from src.services.schedule_optimizer import ScheduleOptimizer, build_section_options
+from src.utils.times import parse_times
+
+
+def _offering(code, times, credits=3.0, section="0"):
+    return {
+        "code": code,
+        "title": f"Course {code}",
+        "credits": credits,
+        "raw": {"Times": times, "Section": section},
+    }
+
+
+def test_parse_times_supports_both_formats():
+    assert parse_times("MON 10:30am-11:20am, WED 10:30am-11:20am, ") == (
+        ("MON", 630, 680),
+        ("WED", 630, 680),
+    )
+    assert parse_times("TUE/THU 1:30 PM - 2:50 PM") == (
+        ("TUE", 810, 890),
+        ("THU", 810, 890),
+    )
+    assert parse_times("TBD") == ()
+
+
+def test_optimizer_avoids_conflicts_and_respects_credit_limit():
+    offerings = [
+        _offering("CS120", "MON 9:30am-10:20am, WED 9:30am-10:20am"),
+        _offering("CS121", "MON 10:00am-10:50am"),
+        _offering("CS130", "TUE 9:00am-10:15am, THU 9:00am-10:15am"),
+        _offering("CS140", "FRI 9:00am-11:50am"),
+        _offering("CS150", "TBD", credits=4.0),
+    ]
+    options = build_section_options(
+        offerings,
+        required_codes={"CS120", "CS121", "CS130", "CS140"},
+        unavailable_days=["Friday"],
+    )
+
+    schedules = ScheduleOptimizer().optimize(options, max_credits=9, top_k=2)
+
+    assert len(schedules) == 2
+    best = schedules[0]
+    codes = {s.code for s in best.sections}
+    assert best.required_covered == 2
+    assert best.total_credits <= 9
+    assert "CS140" not in codes
+    assert not {"CS120", "CS121"} <= codes
+    assert schedules[0].score >= schedules[1].score
+
+
+def test_optimizer_picks_one_section_per_course():
+    offerings = [
+        _offering("CS120", "MON 9:30am-10:20am", section="A"),
+        _offering("CS120", "TUE 9:30am-10:20am", section="B"),
+        _offering("CS130", "MON 9:30am-10:20am"),
+    ]
+    options = build_section_options(offerings, required_codes={"CS120", "CS130"})
+
+    best = ScheduleOptimizer().optimize(options, top_k=1)[0]
+
+    assert [(s.code, s.section) for s in best.sections] == [
+        ("CS120", "B"),
+        ("CS130", "0"),
+    ]
+
+
+def test_prompt_filters_eligible_courses_once():
+    generator = PromptGenerator("I'm a student in MS CIS")
+
+    with patch.object(
+        generator,
+        "filter_courses_by_prerequisites",
+        wraps=generator.filter_courses_by_prerequisites,
+    ) as eligible:
+        generator.build_prompt()
+
+    eligible.assert_called_once()
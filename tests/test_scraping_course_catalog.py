@@ -0,0 +1,115 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from src.external.scraping_course_catalog import (
+    CourseScraper,
+    diff_courses,
+    iter_courses,
+    iter_paragraphs,
+)
+
+PAGE = """<html><body>
+<p>Course Descriptions are listed by the College/Center offering the course.</p>
+<p>BUS050</p><p>Pre-term <b>Quantitative</b> Methods</p>
+<p>Refresher of basic quantitative tools&nbsp;</p><p>Credits: 1.68</p>
+<p>CS120</p><p>COLLEGE OF SCIENCE AND ENGINEERING</p><p>Data Structures</p>
+<p>Prerequisite: CS110</p><p>Credits: 3</p><script>track()</script>
+<p>CS130</p><p>Discrete Math</p><p>Prerequisites CS120</p><p>Credits: TBD</p>
+</body></html>"""
+
+
+def _chunks(text, size):
+    return (text[i : i + size] for i in range(0, len(text), size))
+
+
+@pytest.mark.parametrize("size", [1, 5, 64, len(PAGE)])
+def test_paragraphs_match_beautifulsoup(size):
+    soup = BeautifulSoup(PAGE, "html.parser")
+    expected = [
+        p.get_text(strip=True) for p in soup.find_all("p") if p.get_text(strip=True)
+    ]
+
+    assert list(iter_paragraphs(_chunks(PAGE, size))) == expected
+
+
+def test_courses_are_built_in_one_pass():
+    courses = list(iter_courses(iter_paragraphs([PAGE])))
+
+    assert [c["code"] for c in courses][1:] == ["BUS050", "CS120", "CS130"]
+    assert courses[1] == {
+        "faculty": "Unknown",
+        "code": "BUS050",
+        "title": "Pre-termQuantitativeMethods",
+        "description": "Refresher of basic quantitative tools",
+        "credits": 1.68,
+        "prerequisites": "",
+    }
+    assert courses[2]["faculty"] == "COLLEGE OF SCIENCE AND ENGINEERING"
+    assert courses[2]["prerequisites"] == "CS110"
+    assert courses[3]["faculty"] == "COLLEGE OF SCIENCE AND ENGINEERING"
+    assert courses[3]["prerequisites"] == "Prerequisites CS120"
+    assert courses[3]["credits"] is None
+
+
+def test_diff_reports_added_removed_and_changed_fields():
+    before = [
+        {"code": "CS100", "title": "Intro", "credits": 3},
+        {"code": "CS120", "title": "Data", "credits": 3},
+    ]
+    after = [
+        {"code": "CS120", "title": "Data Structures", "credits": 3},
+        {"code": "CS130", "title": "Discrete", "credits": 3},
+    ]
+
+    diff = diff_courses(before, after)
+
+    assert diff.to_dict() == {
+        "added": ["CS130"],
+        "removed": ["CS100"],
+        "changed": {"CS120": ["title"]},
+    }
+    assert diff_courses(after, after).empty
+
+
+def test_scrape_writes_all_outputs_and_changes(tmp_path):
+    scraper = CourseScraper()
+    scraper.raw_output_file = str(tmp_path / "all.json")
+    scraper.grouped_output_file = str(tmp_path / "by_faculty.json")
+    scraper.changes_output_file = str(tmp_path / "changes.json")
+
+    first = scraper.scrape_courses(_chunks(PAGE, 100))
+    second = scraper.scrape_courses(
+        _chunks(PAGE.replace("Discrete Math", "Discrete Mathematics"), 100)
+    )
+
+    assert len(first.added) == 4
+    assert second.to_dict() == {
+        "added": [],
+        "removed": [],
+        "changed": {"CS130": ["title"]},
+    }
+    grouped = json.loads((tmp_path / "by_faculty.json").read_text(encoding="utf-8"))
+    assert [c["code"] for c in grouped["COLLEGE OF SCIENCE AND ENGINEERING"]] == [
+        "CS120",
+        "CS130",
+    ]
+    assert len(json.loads((tmp_path / "all.json").read_text(encoding="utf-8"))) == 4
+    assert json.loads((tmp_path / "changes.json").read_text(encoding="utf-8")) == (
+        second.to_dict()
+    )
+
+
+def test_failed_download_closes_the_response():
+    response = MagicMock(status_code=503)
+    response.__enter__.return_value = response
+
+    with patch(
+        "src.external.scraping_course_catalog.requests.get", return_value=response
+    ):
+        with pytest.raises(Exception, match="Failed to fetch page"):
+            list(CourseScraper()._iter_page())
+
+    response.__exit__.assert_called_once()
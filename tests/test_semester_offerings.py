@@ -0,0 +1,98 @@
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.external import scraping_courses
+from src.external.semester_offerings import (
+    COLUMNS,
+    SemesterOfferingsFetcher,
+    parse_offerings,
+    parse_taken_seats,
+)
+from src.services.catalog_store import CATALOG_PATHS
+from src.services.schedule_optimizer import build_section_options
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "semester_offerings.html")
+
+
+@pytest.fixture
+def page():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_rows_match_the_selenium_snapshot(page):
+    with open(CATALOG_PATHS["semester"], "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+
+    offerings = parse_offerings([page])
+
+    assert len(offerings) == 6
+    for offering in offerings:
+        assert {column: offering[column] for column in COLUMNS} in snapshot
+    assert offerings[0]["Course"] == (
+        "EVIDENCE-BASED MATERNAL & CHILD HEALTH NURSING\n\n(BSN202)\n(Prerequisite)"
+    )
+
+
+def test_parsing_is_independent_of_chunking(page):
+    chunks = [page[i : i + 7] for i in range(0, len(page), 7)]
+
+    assert parse_offerings(chunks) == parse_offerings([page])
+
+
+def test_times_and_seats_are_structured(page):
+    first, _, tbd = parse_offerings([page])[:3]
+
+    assert first["Meetings"] == [
+        {"day": "MON", "start_minute": 15 * 60 + 30, "end_minute": 18 * 60 + 20}
+    ]
+    assert (first["Taken"], first["Seats"]) == (19, 25)
+    assert tbd["Times"] == "TBD" and tbd["Meetings"] == []
+    assert parse_taken_seats("Full") == (None, None)
+
+
+def test_missing_table_raises():
+    with pytest.raises(RuntimeError):
+        parse_offerings(["<html><body><table id='other'></table></body></html>"])
+
+
+def test_optimizer_uses_ingested_meetings(page):
+    offering = parse_offerings([page])[0]
+    offering["Times"] = "unparseable"
+
+    (option,) = build_section_options(
+        [{"code": "BSN202", "credits": 3, "raw": offering}]
+    )
+
+    assert option.meetings == (("MON", 930, 1100),)
+
+
+@patch("src.external.semester_offerings.requests.get")
+def test_fetcher_uses_plain_http(mock_get, page):
+    mock_get.return_value = SimpleNamespace(text=page, raise_for_status=lambda: None)
+
+    offerings = SemesterOfferingsFetcher("http://offerings.test").fetch()
+
+    assert len(offerings) == 6
+    mock_get.assert_called_once_with("http://offerings.test", timeout=60)
+
+
+def test_scraper_falls_back_to_browser(tmp_path):
+    scraper = scraping_courses.CourseScraper()
+    scraper.filename = str(tmp_path / "semester.json")
+    rows = [{"Course": "X (CS100)"}]
+
+    with patch.object(
+        scraping_courses.SemesterOfferingsFetcher,
+        "fetch",
+        side_effect=RuntimeError("Offerings table has no rows"),
+    ), patch.object(scraper, "_scrape_with_browser", return_value=rows) as browser:
+        scraper.run()
+
+    browser.assert_called_once()
+    with open(scraper.filename, "r", encoding="utf-8") as f:
+        assert json.load(f) == rows
@@ -0,0 +1,146 @@
+import json
+
+import fakeredis
+import pytest
+
+from src.services.session_store import RedisSessionStore, first_follow_up
+
+PROMPT = "Full planning prompt with the course table"
+OPENING = [
+    {"role": "user", "parts": ["I'm in MS CIS"]},
+    {"role": "model", "parts": ["Take CS120."]},
+]
+TURN = [
+    {"role": "user", "parts": ["And next?"]},
+    {"role": "model", "parts": ["Then CS130."]},
+]
+
+
+@pytest.fixture
+def store():
+    store = RedisSessionStore()
+    store.client = fakeredis.FakeRedis(decode_responses=True)
+    store.ttl = 100
+    return store
+
+
+def test_turns_are_appended_not_rewritten(store):
+    store.start_session("u1", PROMPT, OPENING)
+    store.append_messages("u1", TURN)
+
+    assert store.history_length("u1") == 4
+    assert store.client.lrange("chat:u1:messages", 0, 1) == [
+        json.dumps(m, separators=(",", ":")) for m in OPENING
+    ]
+    assert store.client.get("chat:u1:prompt") == PROMPT
+
+
+def test_gemini_history_replaces_opening_with_prompt_and_first_follow_up(store):
+    store.start_session("u1", PROMPT, OPENING)
+    store.append_messages("u1", TURN)
+
+    store.append_messages("u1", TURN)
+
+    history = store.get_gemini_history("u1")
+
+    assert history[0] == {"role": "user", "parts": [PROMPT]}
+    assert history[1] == OPENING[1]
+    assert history[2] == {
+        "role": "user",
+        "parts": [first_follow_up("I'm in MS CIS", "And next?")],
+    }
+    assert history[3:] == TURN[1:] + TURN
+    assert store.get_history("u1")[0] == OPENING + TURN + TURN
+
+
+def test_get_history_pages(store):
+    store.start_session("u1", PROMPT, OPENING)
+    store.append_messages("u1", TURN)
+
+    assert store.get_history("u1", offset=1, limit=2) == (
+        [OPENING[1], TURN[0]],
+        4,
+    )
+    assert store.get_history("u1", offset=10) == ([], 4)
+    assert store.get_history("missing") == ([], 0)
+    assert store.get_gemini_history("missing") is None
+
+
+@pytest.mark.parametrize("offset, limit", [(0, 0), (-1, None), (0, -2)])
+def test_get_history_rejects_out_of_range_pages(store, offset, limit):
+    store.start_session("u1", PROMPT, OPENING)
+
+    with pytest.raises(ValueError):
+        store.get_history("u1", offset=offset, limit=limit)
+
+
+def test_append_slides_expiry(store):
+    store.start_session("u1", PROMPT, OPENING)
+    store.client.expire("chat:u1:messages", 5)
+    store.client.expire("chat:u1:prompt", 5)
+
+    store.append_messages("u1", TURN)
+
+    assert store.client.ttl("chat:u1:messages") > 5
+    assert store.client.ttl("chat:u1:prompt") > 5
+
+
+def test_restart_replaces_previous_session(store):
+    store.start_session("u1", PROMPT, OPENING)
+    store.append_messages("u1", TURN)
+
+    store.start_session("u1", "new prompt", TURN)
+
+    assert store.get_history("u1") == (TURN, 2)
+
+
+def test_legacy_blob_is_migrated_on_read(store):
+    store.client.set(
+        "chat:u1",
+        json.dumps(
+            {
+                "gemini_history": [{"role": "user", "parts": [PROMPT]}] + OPENING[1:],
+                "raw_history": OPENING,
+            }
+        ),
+    )
+
+    assert store.history_length("u1") == 2
+    assert store.get_gemini_history("u1")[0]["parts"] == [PROMPT]
+    assert store.get_history("u1") == (OPENING, 2)
+    assert store.client.exists("chat:u1") == 0
+
+
+def test_delete_session_reports_whether_it_existed(store):
+    store.start_session("u1", PROMPT, OPENING)
+
+    assert store.delete_session("u1") is True
+    assert store.delete_session("u1") is False
+    assert store.history_length("u1") == 0
+
+
+def test_summary_is_stored_with_the_turn_and_cleared_on_restart(store):
+    store.start_session("u1", PROMPT, OPENING)
+    assert store.session_state("u1")[:2] == (2, None)
+
+    store.append_messages("u1", TURN, {"text": "notes", "turns": 1})
+    assert store.session_state("u1")[:2] == (4, {"text": "notes", "turns": 1})
+
+    store.append_messages("u1", TURN)
+    assert store.session_state("u1")[1] == {"text": "notes", "turns": 1}
+
+    store.start_session("u1", PROMPT, OPENING)
+    assert store.session_state("u1")[:2] == (2, None)
+
+
+def test_every_start_gets_a_new_session_id(store):
+    first = store.start_session("u1", PROMPT, OPENING)
+    store.append_messages("u1", TURN)
+    assert store.session_state("u1")[2] == first
+
+    second = store.start_session("u1", PROMPT, OPENING)
+    assert second != first
+    assert store.session_state("u1")[2] == second
+
+    store.delete_session("u1")
+    assert store.session_state("u1") == (0, None, None)
@@ -0,0 +1,202 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from src.external.prompt_generator import PromptGenerator
+
+
+class FakeStreamingClient:
+    chunks = ["Take ", "CS120 ", "and CS130."]
+    summary_updated = False
+    context_tokens = 0
+
+    def __init__(
+        self, api_key=None, model_name=None, history=None, chat=None, summary=None
+    ):
+        self.chat = chat or SimpleNamespace(history=list(history or []))
+        self.history = self.chat.history
+
+    def _stream(self, message):
+        self.history.append({"role": "user", "parts": [message]})
+        for chunk in self.chunks:
+            yield chunk
+        self.history.append({"role": "model", "parts": ["".join(self.chunks)]})
+
+    def start_conversation_stream(self, user_input, prompt_generator=None):
+        return self._stream(user_input)
+
+    def continue_conversation_stream(self, message):
+        return self._stream(message)
+
+    def get_history(self):
+        return self.history
+
+
+def _events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        event_line, data_line = block.split("\n")
+        events.append(
+            (event_line.removeprefix("event: "), json.loads(data_line[len("data: ") :]))
+        )
+    return events
+
+
+@patch("src.controllers.planner.GeminiClient", FakeStreamingClient)
+def test_start_chat_stream_forwards_chunks_and_persists(redis_session_store, client):
+    response = client.post(
+        "/api/start_chat/stream",
+        json={"user_id": "test_user", "user_input": "I'm a student in MS IESM"},
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    events = _events(response)
+    assert [data["text"] for name, data in events if name == "chunk"] == (
+        FakeStreamingClient.chunks
+    )
+    assert events[-1] == ("done", {"response": "Take CS120 and CS130."})
+
+    history, total = redis_session_store.get_history("test_user")
+    assert total == 2
+    assert history[1]["parts"] == ["Take CS120 and CS130."]
+
+
+@patch("src.controllers.planner.GeminiClient", FakeStreamingClient)
+def test_continue_chat_stream_appends_to_history(
+    redis_session_store, client, mock_history
+):
+    redis_session_store.start_session("test_user", "Full planning prompt", mock_history)
+
+    response = client.post(
+        "/api/continue_chat/stream",
+        json={"user_id": "test_user", "message": "What next?"},
+    )
+
+    assert _events(response)[-1][0] == "done"
+    history, total = redis_session_store.get_history("test_user")
+    assert total == len(mock_history) + 2
+    assert history[-1]["parts"] == ["Take CS120 and CS130."]
+    gemini_history = redis_session_store.get_gemini_history("test_user")
+    assert gemini_history[0]["parts"] == ["Full planning prompt"]
+
+
+@patch("src.controllers.planner.session_store")
+def test_continue_chat_stream_without_session(mock_store, client):
+    mock_store.session_state.return_value = (0, None, None)
+
+    response = client.post(
+        "/api/continue_chat/stream",
+        json={"user_id": "missing", "message": "Hi"},
+    )
+
+    assert response.status_code == 404
+
+
+@patch("src.controllers.planner.session_store")
+def test_stream_reports_upstream_errors_as_event(mock_store, client):
+    class FailingClient(FakeStreamingClient):
+        def _stream(self, message):
+            yield "partial"
+            raise RuntimeError("Google API error: quota")
+
+    with patch("src.controllers.planner.GeminiClient", FailingClient):
+        response = client.post(
+            "/api/start_chat/stream",
+            json={"user_id": "test_user", "user_input": "I'm a student in MS CIS"},
+        )
+
+    events = _events(response)
+    assert events[-1][0] == "error"
+    assert "quota" in events[-1][1]["error"]
+    mock_store.start_session.assert_not_called()
+
+
+def test_follow_up_turn_reuses_live_chat(redis_session_store, client, empty_chat_cache):
+    created = []
+
+    class TrackingClient(FakeStreamingClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(kwargs.get("chat"))
+
+    hits = empty_chat_cache.hits
+
+    with patch("src.controllers.planner.GeminiClient", TrackingClient):
+        client.post(
+            "/api/start_chat/stream",
+            json={"user_id": "u1", "user_input": "Hello, no program here"},
+        ).get_data()
+        for _ in range(2):
+            client.post(
+                "/api/continue_chat/stream",
+                json={"user_id": "u1", "message": "And next?"},
+            ).get_data()
+
+    assert created[0] is None
+    assert created[1] is not None and created[2] is created[1]
+    assert empty_chat_cache.hits - hits == 2
+    assert redis_session_store.history_length("u1") == 6
+
+    # The live chat and a rehydrated one both carry the opening words on
+    # the first follow-up only; the stored history keeps what was typed.
+    live = created[1].history
+    assert live[2] == redis_session_store.get_gemini_history("u1")[2]
+    assert '"Hello, no program here"' in live[2]["parts"][0]
+    assert live[4]["parts"] == ["And next?"]
+    assert redis_session_store.get_history("u1")[0][2]["parts"] == ["And next?"]
+
+
+def test_restart_served_from_cache_drops_the_old_live_chat(
+    redis_session_store, client, empty_chat_cache
+):
+    created = []
+
+    class TrackingClient(FakeStreamingClient):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(kwargs)
+
+    def start(user_id, user_input):
+        client.post(
+            "/api/start_chat/stream",
+            json={"user_id": user_id, "user_input": user_input},
+        ).get_data()
+
+    with patch("src.controllers.planner.GeminiClient", TrackingClient):
+        start("u2", "I'm a student in MBA")
+        start("u1", "I'm a student in MS CIS")
+        start("u1", "I'm a student in MBA")
+        client.post(
+            "/api/continue_chat/stream",
+            json={"user_id": "u1", "message": "And next?"},
+        ).get_data()
+
+    assert len(created) == 3
+    assert created[-1].get("chat") is None
+    assert created[-1]["history"][0]["parts"] == [
+        PromptGenerator("I'm a student in MBA").build_prompt()
+    ]
+
+
+@patch("src.controllers.planner.GeminiClient")
+def test_follow_up_rehydrates_when_another_worker_appended(
+    mock_gemini, redis_session_store, client, empty_chat_cache
+):
+    session_id = redis_session_store.start_session(
+        "u1",
+        "prompt",
+        [
+            {"role": "user", "parts": ["Hi"]},
+            {"role": "model", "parts": ["Hello"]},
+        ],
+    )
+    stale = SimpleNamespace(history=[{}, {}, {}, {}])
+    empty_chat_cache.checkin("u1", stale, session_id)
+    mock_gemini.return_value.continue_conversation.return_value = "Sure"
+    mock_gemini.return_value.chat = SimpleNamespace(history=[{}] * 4)
+
+    client.post("/api/continue_chat", json={"user_id": "u1", "message": "Next?"})
+
+    assert mock_gemini.call_args.kwargs["history"][0]["parts"] == ["prompt"]
+    assert mock_gemini.call_args.kwargs.get("chat") is None
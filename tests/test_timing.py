@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+from gemini_fakes import FakeModel
+from src.services.timing import begin_request, current_timings, stage, timed
+
+
+def test_stage_outside_a_request_is_a_no_op():
+    with stage("llm"):
+        pass
+
+    assert current_timings() is None
+
+
+def test_nested_stage_is_counted_once():
+    @timed("session")
+    def inner():
+        time.sleep(0.01)
+
+    @timed("session")
+    def outer():
+        inner()
+        inner()
+
+    def request():
+        begin_request()
+        outer()
+        return current_timings()
+
+    timings = asyncio.run(asyncio.to_thread(request))
+
+    assert set(timings.stages) == {"session"}
+    assert 0.02 <= timings.stages["session"] < timings.elapsed() + 1e-6
+
+
+def test_timed_wraps_coroutines():
+    @timed("llm")
+    async def call():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def request():
+        begin_request()
+        return await call(), current_timings()
+
+    result, timings = asyncio.run(request())
+
+    assert result == "done"
+    assert timings.stages["llm"] >= 0.01
+
+
+def test_responses_carry_server_timing(client, redis_session_store):
+    response = client.get("/api/chat_history?user_id=nobody")
+
+    stages = {}
+    for entry in response.headers["Server-Timing"].split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        stages[name] = float(duration)
+    assert set(stages) == {"session", "total"}
+    assert stages["session"] <= stages["total"]
+
+
+def test_stream_reports_llm_time_as_a_trailing_event(client, redis_session_store):
+    redis_session_store.start_session(
+        "u1",
+        "prompt",
+        [{"role": "user", "parts": ["Hi"]}, {"role": "model", "parts": ["Hello"]}],
+    )
+
+    model = FakeModel(reply="Take CS120.", chunk_delay=0.01)
+    with patch("src.external.gemini_client.get_model", return_value=model):
+        response = client.post(
+            "/api/continue_chat/stream", json={"user_id": "u1", "message": "Next?"}
+        )
+        blocks = response.get_data(as_text=True).strip().split("\n\n")
+
+    events = [block.split("\n") for block in blocks]
+    assert [e[0] for e in events[-2:]] == ["event: timing", "event: done"]
+    timing = json.loads(events[-2][1].removeprefix("data: "))
+    assert timing["llm"] >= 20
+    assert timing["session"] > 0 and timing["total"] >= timing["llm"]